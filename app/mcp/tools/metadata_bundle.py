@@ -0,0 +1,392 @@
+"""Shared metadata cache for field usage analysis
+
+Fetches Apex, Flow, Validation Rule, Workflow Rule, Page Layout, Report and
+Email Template sources once and keeps them in the global cache, so the
+schema analysis tools can check field references in memory instead of
+re-downloading the org's metadata on every call.
+
+Created by Sameer
+"""
+import logging
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+from simple_salesforce.exceptions import SalesforceAuthenticationFailed, SalesforceExpiredSession
+
+from app.utils.cache import get_cache
+
+logger = logging.getLogger(__name__)
+
+# Session problems must reach the caller - skipping the category cannot fix them
+FATAL_ERRORS = (SalesforceExpiredSession, SalesforceAuthenticationFailed)
+
+# Body returned for managed-package Apex whose source is not visible
+_HIDDEN_BODY = "(hidden)"
+
+
+@dataclass
+class MetadataBundle:
+    """Searchable metadata sources for one object, keyed by component name"""
+    apex_classes: Dict[str, str] = field(default_factory=dict)
+    apex_triggers: Dict[str, str] = field(default_factory=dict)
+    flows: Dict[str, str] = field(default_factory=dict)
+    validation_rules: Dict[str, dict] = field(default_factory=dict)
+    workflow_rules: Dict[str, str] = field(default_factory=dict)
+    layouts: Dict[str, list] = field(default_factory=dict)
+    reports: Dict[str, str] = field(default_factory=dict)
+    email_templates: Dict[str, str] = field(default_factory=dict)
+    # Categories that failed to load, with the error - empty is not "no references"
+    unavailable: Dict[str, str] = field(default_factory=dict)
+    # Token indexes and the field -> layouts map, built on first use by
+    # schema_analysis. Kept on the bundle so they always match its sources
+    source_indexes: Optional[dict] = field(default=None, repr=False, compare=False)
+    layout_index: Optional[dict] = field(default=None, repr=False, compare=False)
+
+
+def _org_key(sf) -> Optional[str]:
+    """Identify the org behind a connection for cache keys (None if unknown)"""
+    return getattr(sf, "sf_instance", None) or getattr(sf, "base_url", None)
+
+
+def get_apex_sources(sf) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """Get the org's Apex class and trigger bodies (cached per org).
+
+    Managed-package code (NamespacePrefix set) is skipped - it is read-only
+    and its body is usually hidden.
+
+    Args:
+        sf: Salesforce connection
+
+    Returns:
+        Tuple of ({class_name: body}, {trigger_name: body})
+
+    Raises:
+        Any API error - nothing is cached, so an empty result always means
+        the org really has no matching code
+    """
+    cache = get_cache()
+    # Connections that can't name their org are never cached, so one org
+    # can't be served another's sources
+    key = _org_key(sf)
+    sources = cache.get('apex_classes', key) if key else None
+    if sources is not None:
+        return sources
+
+    apex_classes: Dict[str, str] = {}
+    apex_triggers: Dict[str, str] = {}
+
+    # 1. Fetch ALL Apex Classes (ONCE)
+    logger.info("Fetching all Apex Classes...")
+    apex_query = "SELECT Id, Name, Body FROM ApexClass WHERE NamespacePrefix = null"
+    apex_result = sf.query_all(apex_query)
+    for apex in apex_result.get("records", []):
+        body = apex.get("Body") or ""
+        if body == _HIDDEN_BODY:
+            continue
+        apex_classes[apex["Name"]] = body
+    logger.info(f"  ✓ Cached {len(apex_classes)} Apex classes")
+
+    # 2. Fetch ALL Apex Triggers (ONCE)
+    logger.info("Fetching all Apex Triggers...")
+    trigger_query = "SELECT Id, Name, Body FROM ApexTrigger WHERE NamespacePrefix = null"
+    trigger_result = sf.query_all(trigger_query)
+    for trigger in trigger_result.get("records", []):
+        body = trigger.get("Body") or ""
+        if body == _HIDDEN_BODY:
+            continue
+        apex_triggers[trigger["Name"]] = body
+    logger.info(f"  ✓ Cached {len(apex_triggers)} triggers")
+
+    sources = (apex_classes, apex_triggers)
+    if key:
+        cache.set('apex_classes', key, sources)
+    return sources
+
+
+def get_metadata_bundle(sf, object_name: str, include_reports: bool = False) -> MetadataBundle:
+    """Get every metadata source that can reference fields of an object.
+
+    Bundles are cached per org and object, so repeated analysis calls within
+    the cache TTL skip the downloads entirely. Callers must treat the
+    returned bundle as read-only.
+
+    Args:
+        sf: Salesforce connection
+        object_name: Object API name
+        include_reports: Whether to fetch report definitions (slow)
+
+    Returns:
+        MetadataBundle with all cached sources
+    """
+    cache = get_cache()
+    org_key = _org_key(sf)
+    key = f"{org_key}:{object_name}:{'reports' if include_reports else 'no_reports'}" if org_key else None
+    bundle = cache.get('metadata_bundle', key) if key else None
+    if bundle is not None:
+        logger.info(f"Using cached metadata bundle for {object_name}")
+        return bundle
+
+    bundle = MetadataBundle()
+    try:
+        bundle.apex_classes, bundle.apex_triggers = get_apex_sources(sf)
+    except FATAL_ERRORS:
+        raise
+    except Exception as e:
+        logger.warning(f"Error fetching Apex sources: {e}")
+        bundle.unavailable["apex_classes"] = bundle.unavailable["apex_triggers"] = str(e)
+
+    # 1. Fetch ALL Active Flows (ONCE) - Get actual flow content via Tooling API
+    try:
+        logger.info("Fetching all active Flows via Tooling API...")
+        # Query Flow objects to get latest active versions
+        flow_query = "SELECT Id, Definition.DeveloperName, Status FROM Flow WHERE Status = 'Active'"
+        flow_result = sf.restful("tooling/query", params={'q': flow_query})
+
+        for flow in flow_result.get("records", []):
+            flow_id = flow.get("Id", "")
+            # Get DeveloperName from Definition object
+            definition = flow.get("Definition", {})
+            flow_api_name = definition.get("DeveloperName", "") if definition else ""
+
+            # Try to get flow metadata to check for field references
+            try:
+                # Fetch the flow's full definition which contains field references
+                flow_detail = sf.restful(f"tooling/sobjects/Flow/{flow_id}")
+                metadata = flow_detail.get("Metadata", {})
+                flow_label = metadata.get("label", flow_api_name)
+
+                # Combine all searchable content including metadata
+                metadata_str = str(metadata)
+                flow_content = f"{flow_label} {flow_api_name} {metadata_str}"
+
+            except FATAL_ERRORS:
+                raise
+            except Exception:
+                # If metadata fetch fails, use basic info
+                logger.debug(f"Could not fetch full metadata for flow {flow_api_name}, using basic info")
+                flow_content = flow_api_name
+                flow_label = flow_api_name
+
+            bundle.flows[flow_label or flow_api_name] = flow_content
+            logger.debug(f"Cached flow: {flow_label}")
+
+        logger.info(f"  ✓ Cached {len(bundle.flows)} active flows")
+    except FATAL_ERRORS:
+        raise
+    except Exception as e:
+        logger.warning(f"Error fetching Flows: {e}")
+        bundle.unavailable["flows"] = str(e)
+
+    # 2. Fetch ALL Validation Rules for this object (ONCE)
+    try:
+        logger.info("Fetching all Validation Rules...")
+        # First query: Get ValidationName and Id only (ErrorConditionFormula is not directly queryable)
+        vr_query = f"""
+            SELECT ValidationName, Id
+            FROM ValidationRule
+            WHERE EntityDefinition.QualifiedApiName = '{object_name}' AND Active = true
+        """
+        vr_result = sf.restful("tooling/query", params={'q': vr_query})
+
+        # Second step: Fetch full record with Metadata for each validation rule
+        for rec in vr_result.get("records", []):
+            vr_id = rec.get("Id")
+            vr_name = rec.get("ValidationName")
+
+            # Get full record with Metadata
+            try:
+                detail = sf.restful(f"tooling/sobjects/ValidationRule/{vr_id}")
+                metadata = detail.get("Metadata") or {}
+                formula = metadata.get("errorConditionFormula", "")
+                error_msg = metadata.get("errorMessage", "")
+
+                bundle.validation_rules[vr_name] = {
+                    "formula": formula,
+                    "error_msg": error_msg,
+                    "name": vr_name
+                }
+            except FATAL_ERRORS:
+                raise
+            except Exception as detail_error:
+                logger.warning(f"Error fetching details for validation rule {vr_name}: {detail_error}")
+
+        logger.info(f"  ✓ Cached {len(bundle.validation_rules)} validation rules")
+    except FATAL_ERRORS:
+        raise
+    except Exception as e:
+        logger.warning(f"Error fetching Validation Rules: {e}")
+        bundle.unavailable["validation_rules"] = str(e)
+
+    # 3. Fetch ALL Workflow Rules for this object (ONCE)
+    try:
+        logger.info("Fetching all Workflow Rules...")
+        # First query: Get Id and Name only (Formula is not directly queryable)
+        wf_query = f"""
+            SELECT Id, Name
+            FROM WorkflowRule
+            WHERE TableEnumOrId = '{object_name}' AND IsActive = true
+        """
+        wf_result = sf.restful("tooling/query", params={'q': wf_query})
+
+        # Second step: Fetch full record with Metadata for each workflow rule
+        for rec in wf_result.get("records", []):
+            wf_id = rec.get("Id")
+            wf_name = rec.get("Name")
+
+            # Get full record with Metadata
+            try:
+                detail = sf.restful(f"tooling/sobjects/WorkflowRule/{wf_id}")
+                metadata = detail.get("Metadata") or {}
+                formula = metadata.get("formula", "")
+
+                bundle.workflow_rules[wf_name] = formula
+            except FATAL_ERRORS:
+                raise
+            except Exception as detail_error:
+                logger.warning(f"Error fetching details for workflow rule {wf_name}: {detail_error}")
+
+        logger.info(f"  ✓ Cached {len(bundle.workflow_rules)} workflow rules")
+    except FATAL_ERRORS:
+        raise
+    except Exception as e:
+        logger.warning(f"Error fetching Workflow Rules: {e}")
+        bundle.unavailable["workflow_rules"] = str(e)
+
+    # 4. Fetch ALL Page Layouts for this object (ONCE)
+    try:
+        logger.info(f"Fetching all Page Layouts for {object_name}...")
+        # First query: Get Id, Name, and EntityDefinitionId
+        # Note: We'll filter by object after fetching to ensure we only get layouts for this object
+        layout_query = f"""
+            SELECT Id, Name, EntityDefinitionId, EntityDefinition.QualifiedApiName
+            FROM Layout
+            WHERE EntityDefinition.QualifiedApiName = '{object_name}'
+        """
+        layout_result = sf.restful("tooling/query", params={'q': layout_query})
+
+        layouts_for_object = layout_result.get("records", [])
+        logger.info(f"Found {len(layouts_for_object)} layouts for {object_name}")
+
+        # Second step: Fetch full record with Metadata for each layout
+        for layout in layouts_for_object:
+            layout_id = layout.get("Id")
+            layout_name = layout.get("Name")
+
+            try:
+                # Get full record with Metadata
+                layout_detail = sf.restful(f"tooling/sobjects/Layout/{layout_id}")
+                metadata = layout_detail.get("Metadata", {})
+
+                # Extract field names from layout sections
+                field_names = []
+                layout_sections = metadata.get("layoutSections", [])
+                for section in layout_sections:
+                    layout_columns = section.get("layoutColumns", [])
+                    for column in layout_columns:
+                        layout_items = column.get("layoutItems", [])
+                        for item in layout_items:
+                            field_name = item.get("field")
+                            if field_name:
+                                field_names.append(sys.intern(field_name.strip()))
+
+                bundle.layouts[layout_name] = field_names
+                logger.debug(f"Cached layout '{layout_name}' with {len(field_names)} fields")
+            except FATAL_ERRORS:
+                raise
+            except Exception as layout_err:
+                logger.debug(f"Error fetching metadata for layout {layout_name}: {layout_err}")
+                bundle.layouts[layout_name] = []
+
+        logger.info(f"  ✓ Cached {len(bundle.layouts)} page layouts for {object_name}")
+    except FATAL_ERRORS:
+        raise
+    except Exception as e:
+        logger.warning(f"Error fetching Page Layouts: {e}")
+        bundle.unavailable["page_layouts"] = str(e)
+
+    # 5. Fetch ALL Reports (LIMITED) (ONCE) - OPTIONAL (only if requested)
+    if include_reports:
+        try:
+            logger.info("Fetching reports (limited to 50 for performance)...")
+            report_query = "SELECT Id, Name FROM Report LIMIT 50"
+            report_result = sf.query_all(report_query)
+
+            report_count = 0
+            for report in report_result.get("records", []):
+                if report_count >= 50:  # Hard limit to prevent timeout
+                    break
+
+                report_id = report["Id"]
+                report_name = report["Name"]
+
+                try:
+                    # Get report metadata (with timeout protection)
+                    report_describe = sf.restful(f'analytics/reports/{report_id}/describe')
+                    if report_describe:
+                        report_metadata = report_describe.get("reportMetadata", {})
+                        # Store all columns/fields in this report
+                        all_fields = []
+                        all_fields.extend(report_metadata.get("detailColumns", []))
+
+                        for agg in report_metadata.get("aggregates", []):
+                            all_fields.append(str(agg))
+
+                        for group in report_metadata.get("groupingsDown", []) + report_metadata.get("groupingsAcross", []):
+                            all_fields.append(str(group))
+
+                        for rf in report_metadata.get("reportFilters", []):
+                            all_fields.append(rf.get("column", ""))
+
+                        bundle.reports[report_name] = " ".join(all_fields)
+                        report_count += 1
+                except FATAL_ERRORS:
+                    raise
+                except Exception as e:
+                    # Skip problematic reports
+                    logger.debug(f"Skipping report {report_name}: {e}")
+                    bundle.reports[report_name] = report_name
+
+            logger.info(f"  ✓ Cached {len(bundle.reports)} reports")
+        except FATAL_ERRORS:
+            raise
+        except Exception as e:
+            logger.warning(f"Error fetching Reports (continuing without report analysis): {e}")
+            bundle.unavailable["reports"] = str(e)
+            # Continue without reports - don't fail the whole analysis
+    else:
+        logger.info("  ⊘ Skipping reports (include_reports=False) - use include_reports=True to analyze reports")
+
+    # 6. Fetch ALL Email Templates (ONCE) - Always fetch
+    try:
+        logger.info("Fetching all Email Templates...")
+        # Query EmailTemplate - check HtmlValue, Body, Subject, BrandTemplateId
+        email_query = """
+            SELECT Id, Name, DeveloperName, Subject, HtmlValue, Body
+            FROM EmailTemplate
+            WHERE IsActive = true
+            LIMIT 500
+        """
+        email_result = sf.query_all(email_query)
+        for email in email_result.get("records", []):
+            email_name = email.get("Name") or email.get("DeveloperName", "Unknown")
+            # Combine all searchable content
+            email_content = " ".join([
+                email.get("Subject") or "",
+                email.get("HtmlValue") or "",
+                email.get("Body") or "",
+                email.get("DeveloperName") or ""
+            ])
+            bundle.email_templates[email_name] = email_content
+            logger.debug("Cached email template: %s", email_name)
+        logger.info(f"  ✓ Cached {len(bundle.email_templates)} email templates")
+    except FATAL_ERRORS:
+        raise
+    except Exception as e:
+        logger.warning(f"Error fetching Email Templates: {e}")
+        bundle.unavailable["email_templates"] = str(e)
+
+    # Never cache a partial bundle - the next call should retry the failed sources
+    if key and not bundle.unavailable:
+        cache.set('metadata_bundle', key, bundle)
+    return bundle
@@ -6,14 +6,123 @@ import logging
 import json
 import csv
 import os
-from typing import List, Optional
+import re
+import sys
+from typing import Dict, Iterator, List, Optional, Tuple
+from bisect import bisect_right
+from collections import defaultdict
+from contextlib import nullcontext
 from datetime import datetime
+from itertools import accumulate, islice
+from urllib.parse import quote
 
+from simple_salesforce.exceptions import SalesforceMalformedRequest, SalesforceRefusedRequest
+
+from app.config import get_config
 from app.mcp.server import register_tool
 from app.services.salesforce import get_salesforce_connection
+from app.mcp.tools.metadata_bundle import FATAL_ERRORS, MetadataBundle, get_apex_sources, get_metadata_bundle
 
 logger = logging.getLogger(__name__)
 
+# Optional: Hyperscan matches all field names against a source in one SIMD pass
+try:
+    import hyperscan
+    HYPERSCAN_AVAILABLE = True
+except ImportError:
+    HYPERSCAN_AVAILABLE = False
+
+# Optional: Aho-Corasick automaton - one pass per source for all field names
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# Errors from the EntityParticle query that describe() can work around
+# (unsupported query, missing permission) - anything else is re-raised
+_FIELD_QUERY_ERRORS = (SalesforceMalformedRequest, SalesforceRefusedRequest)
+
+# EntityParticle DataType labels -> describe() field types (longer prefixes first)
+_DATA_TYPE_PREFIXES = (
+    ("Picklist (Multi-Select)", "multipicklist"),
+    ("Picklist", "picklist"),
+    ("Text (Encrypted)", "encryptedstring"),
+    ("Long Text Area", "textarea"),
+    ("Rich Text Area", "textarea"),
+    ("Text Area", "textarea"),
+    ("Text", "string"),
+    ("Auto Number", "string"),
+    ("Number", "double"),
+    ("Roll-Up Summary", "double"),
+    ("Currency", "currency"),
+    ("Percent", "percent"),
+    ("Checkbox", "boolean"),
+    ("Date/Time", "datetime"),
+    ("Date", "date"),
+    ("Time", "time"),
+    ("Email", "email"),
+    ("Phone", "phone"),
+    ("URL", "url"),
+    ("Geolocation", "location"),
+    ("Lookup", "reference"),
+    ("Master-Detail", "reference"),
+    ("External Lookup", "reference"),
+    ("Indirect Lookup", "reference"),
+    ("Hierarchy", "reference"),
+)
+
+# Compact separators - pretty-printing is 2-3x slower and inflates payloads
+_COMPACT_SEPARATORS = (",", ":")
+
+
+def _to_json(data) -> str:
+    """Serialize a tool response, pretty-printed only in debug mode."""
+    if get_config().debug_mode:
+        return json.dumps(data, indent=2)
+    return json.dumps(data, separators=_COMPACT_SEPARATORS)
+
+
+def _tooling_composite_query(sf, queries: Dict[str, str]) -> Tuple[Dict[str, list], Dict[str, str]]:
+    """Run several Tooling API queries in a single composite request.
+
+    Args:
+        sf: Salesforce connection
+        queries: Mapping of reference id to SOQL query (at most 25)
+
+    Returns:
+        Tuple of (records per reference id, error per reference id) - a
+        failed subrequest appears only in the errors, never as empty records
+    """
+    base_path = f"/services/data/v{sf.sf_version}/tooling/query/?q="
+    payload = {
+        "allOrNone": False,
+        "compositeRequest": [
+            {
+                "method": "GET",
+                "url": base_path + quote(" ".join(query.split())),
+                "referenceId": ref
+            }
+            for ref, query in queries.items()
+        ]
+    }
+    response = sf.toolingexecute("composite", method="POST", data=payload)
+
+    results = {}
+    errors = {}
+    for sub in response.get("compositeResponse", []):
+        ref = sub.get("referenceId")
+        if sub.get("httpStatusCode", 500) >= 400:
+            logger.warning(f"Composite subrequest '{ref}' failed: {sub.get('body')}")
+            errors[ref] = str(sub.get("body"))
+            continue
+        results[ref] = (sub.get("body") or {}).get("records", [])
+    # A subrequest missing from the response did not run either
+    for ref in queries:
+        if ref not in results and ref not in errors:
+            errors[ref] = "No response for subrequest"
+    return results, errors
+
 
 @register_tool
 def analyze_object_dependencies(object_name: str) -> str:
@@ -60,45 +169,105 @@ def analyze_object_dependencies(object_name: str) -> str:
                     "field": child_rel["field"]
                 })
 
-        # Get validation rules
-        vr_query = f"""
-            SELECT Id, ValidationName, Active, ErrorDisplayField, ErrorMessage
-            FROM ValidationRule
-            WHERE EntityDefinition.QualifiedApiName = '{object_name}'
-        """
-        try:
-            vr_result = sf.toolingexecute(f"query/?q={vr_query}")
-            dependencies["validation_rules"] = vr_result.get("records", [])
-        except:
-            pass
-
-        # Get triggers
-        trigger_query = f"""
-            SELECT Id, Name, Status, UsageAfterInsert, UsageAfterUpdate,
-                   UsageAfterDelete, UsageBeforeInsert, UsageBeforeUpdate, UsageBeforeDelete
-            FROM ApexTrigger
-            WHERE TableEnumOrId = '{object_name}'
-        """
+        # Get validation rules, triggers and workflow rules in one composite round-trip
+        queries = {
+            "validation_rules": f"""
+                SELECT Id, ValidationName, Active, ErrorDisplayField, ErrorMessage
+                FROM ValidationRule
+                WHERE EntityDefinition.QualifiedApiName = '{object_name}'
+            """,
+            "triggers": f"""
+                SELECT Id, Name, Status, UsageAfterInsert, UsageAfterUpdate,
+                       UsageAfterDelete, UsageBeforeInsert, UsageBeforeUpdate, UsageBeforeDelete
+                FROM ApexTrigger
+                WHERE TableEnumOrId = '{object_name}'
+            """,
+            "workflows": f"""
+                SELECT Id, Name
+                FROM WorkflowRule
+                WHERE TableEnumOrId = '{object_name}'
+            """
+        }
+        # Categories that could not be fetched are None, not an empty list,
+        # and listed with the error - an empty list means "none exist"
         try:
-            trigger_result = sf.toolingexecute(f"query/?q={trigger_query}")
-            dependencies["triggers"] = trigger_result.get("records", [])
-        except:
-            pass
+            records, unavailable = _tooling_composite_query(sf, queries)
+            dependencies.update(records)
+        except FATAL_ERRORS:
+            raise
+        except Exception as e:
+            logger.warning(f"Error fetching tooling dependencies for {object_name}: {e}")
+            unavailable = dict.fromkeys(queries, str(e))
+        for category in unavailable:
+            dependencies[category] = None
+
+        def count(category: str) -> Optional[int]:
+            items = dependencies[category]
+            return None if items is None else len(items)
 
-        return json.dumps({
+        return _to_json({
             "success": True,
             "dependencies": dependencies,
             "summary": {
                 "lookup_count": len(dependencies["lookup_fields"]),
                 "child_count": len(dependencies["child_objects"]),
-                "validation_rules": len(dependencies["validation_rules"]),
-                "triggers": len(dependencies["triggers"])
-            }
-        }, indent=2)
+                "validation_rules": count("validation_rules"),
+                "triggers": count("triggers"),
+                "workflows": count("workflows")
+            },
+            "unavailable_sources": unavailable
+        })
 
     except Exception as e:
         logger.exception("analyze_object_dependencies failed")
-        return json.dumps({"success": False, "error": str(e)})
+        return _to_json({"success": False, "error": str(e)})
+
+
+def _describe_type(data_type: str) -> str:
+    """Map an EntityParticle DataType ("Text(255)") to its describe() type ("string")."""
+    # Formulas report their result type, as describe() does
+    if data_type.startswith("Formula (") and data_type.endswith(")"):
+        data_type = data_type[len("Formula ("):-1]
+    for prefix, field_type in _DATA_TYPE_PREFIXES:
+        if data_type.startswith(prefix):
+            return field_type
+    return "anyType"
+
+
+def _get_custom_fields(sf, object_name: str) -> List[dict]:
+    """List an object's custom fields without downloading the full describe.
+
+    EntityParticle rows are a fraction of the size of describe() field
+    metadata on wide objects. Falls back to describe() if the org rejects the
+    query or the user may not run it; session and other errors propagate,
+    since describe() would fail the same way.
+
+    Returns:
+        Describe-style field dicts with name, label, type and calculatedFormula
+    """
+    try:
+        # '_' is a LIKE wildcard, so the __c suffix is escaped
+        result = sf.query_all(f"""
+            SELECT QualifiedApiName, Label, DataType
+            FROM EntityParticle
+            WHERE EntityDefinition.QualifiedApiName = '{object_name}'
+              AND QualifiedApiName LIKE '%\\_\\_c'
+        """)
+        return [
+            {
+                "name": p["QualifiedApiName"],
+                "label": p["Label"],
+                "type": _describe_type(p["DataType"]),
+                "custom": True,
+                # Not exposed by EntityParticle
+                "calculatedFormula": None
+            }
+            for p in result.get("records", [])
+        ]
+    except _FIELD_QUERY_ERRORS as e:
+        logger.warning(f"EntityParticle query failed for {object_name}, using describe: {e}")
+        describe = sf.__getattr__(object_name).describe()
+        return [f for f in describe["fields"] if f.get("custom")]
 
 
 @register_tool
@@ -118,45 +287,24 @@ def find_unused_fields(object_name: str, days: int = 90) -> str:
         sf = get_salesforce_connection()
 
         # Get all custom fields
-        describe = sf.__getattr__(object_name).describe()
-        custom_fields = [f for f in describe["fields"] if f.get("custom")]
+        custom_fields = _get_custom_fields(sf, object_name)
 
         # For each field, check if it appears in SOQL queries, Apex, etc.
         # This is a simplified version - full implementation would need Field History
         unused_candidates = []
 
+        # Apex bodies are fetched once (and cached) instead of two LIKE queries per field
+        apex_classes, apex_triggers = get_apex_sources(sf)
+
         for field in custom_fields:
             field_name = field["name"]
 
-            # Try to find references in Apex classes
-            apex_query = f"""
-                SELECT Id, Name
-                FROM ApexClass
-                WHERE Body LIKE '%{field_name}%'
-                LIMIT 1
-            """
-
-            try:
-                apex_result = sf.toolingexecute(f"query/?q={apex_query}")
-                has_apex_reference = len(apex_result.get("records", [])) > 0
-            except:
-                has_apex_reference = False
-
-            # Try to find in triggers
-            trigger_query = f"""
-                SELECT Id, Name
-                FROM ApexTrigger
-                WHERE Body LIKE '%{field_name}%'
-                LIMIT 1
-            """
-
-            try:
-                trigger_result = sf.toolingexecute(f"query/?q={trigger_query}")
-                has_trigger_reference = len(trigger_result.get("records", [])) > 0
-            except:
-                has_trigger_reference = False
+            # One reference is enough - stop at the first class or trigger hit
+            if any(field_name in body for body in apex_classes.values()):
+                continue
+            has_trigger_reference = any(field_name in body for body in apex_triggers.values())
 
-            if not has_apex_reference and not has_trigger_reference:
+            if not has_trigger_reference:
                 unused_candidates.append({
                     "field_name": field_name,
                     "label": field["label"],
@@ -165,18 +313,18 @@ def find_unused_fields(object_name: str, days: int = 90) -> str:
                     "reason": "No references found in Apex or Triggers"
                 })
 
-        return json.dumps({
+        return _to_json({
             "success": True,
             "object": object_name,
             "total_custom_fields": len(custom_fields),
             "unused_candidates": unused_candidates,
             "unused_count": len(unused_candidates),
             "note": "Manual verification recommended before deletion"
-        }, indent=2)
+        })
 
     except Exception as e:
         logger.exception("find_unused_fields failed")
-        return json.dumps({"success": False, "error": str(e)})
+        return _to_json({"success": False, "error": str(e)})
 
 
 @register_tool
@@ -220,7 +368,7 @@ def generate_object_diagram(object_names: List[str]) -> str:
                                 "type": "Master-Detail" if not field.get("nillable") else "Lookup"
                             })
 
-        return json.dumps({
+        return _to_json({
             "success": True,
             "diagram": {
                 "nodes": nodes,
@@ -230,11 +378,11 @@ def generate_object_diagram(object_names: List[str]) -> str:
                 "object_count": len(nodes),
                 "relationship_count": len(edges)
             }
-        }, indent=2)
+        })
 
     except Exception as e:
         logger.exception("generate_object_diagram failed")
-        return json.dumps({"success": False, "error": str(e)})
+        return _to_json({"success": False, "error": str(e)})
 
 
 @register_tool
@@ -282,16 +430,16 @@ def list_all_objects(filter_type: str = "all") -> str:
                     "deletable": obj.get("deletable", False)
                 })
 
-        return json.dumps({
+        return _to_json({
             "success": True,
             "filter": filter_type,
             "total_count": len(filtered),
             "objects": filtered
-        }, indent=2)
+        })
 
     except Exception as e:
         logger.exception("list_all_objects failed")
-        return json.dumps({"success": False, "error": str(e)})
+        return _to_json({"success": False, "error": str(e)})
 
 
 @register_tool
@@ -315,7 +463,7 @@ def get_field_usage_stats(object_name: str) -> str:
         total_records = count_result.get("totalSize", 0)
 
         if total_records == 0:
-            return json.dumps({
+            return _to_json({
                 "success": True,
                 "object": object_name,
                 "total_records": 0,
@@ -354,17 +502,17 @@ def get_field_usage_stats(object_name: str) -> str:
             # Fallback to individual field queries
             logger.warning(f"FIELDS(ALL) not supported, using individual queries: {e}")
 
-        return json.dumps({
+        return _to_json({
             "success": True,
             "object": object_name,
             "total_records": total_records,
             "sample_size": len(records) if 'records' in locals() else 0,
             "field_stats": field_stats
-        }, indent=2)
+        })
 
     except Exception as e:
         logger.exception("get_field_usage_stats failed")
-        return json.dumps({"success": False, "error": str(e)})
+        return _to_json({"success": False, "error": str(e)})
 
 
 @register_tool
@@ -395,31 +543,317 @@ def test_field_analysis(object_name: str, field_name: str) -> str:
             }
         }
 
-        # Simple Apex class check
-        try:
-            apex_query = f"SELECT Id, Name FROM ApexClass WHERE Body LIKE '%{field_name}%' LIMIT 10"
-            apex_result = sf.query_all(apex_query)
-            result["usage"]["apex_classes"] = [r["Name"] for r in apex_result.get("records", [])]
-        except Exception as e:
-            result["usage"]["apex_classes_error"] = str(e)
-
-        # Simple trigger check
+        # Check the cached Apex class and trigger bodies - case-insensitive like
+        # SOQL LIKE, and at most 10 names per category
         try:
-            trigger_query = f"SELECT Id, Name FROM ApexTrigger WHERE Body LIKE '%{field_name}%' LIMIT 10"
-            trigger_result = sf.query_all(trigger_query)
-            result["usage"]["apex_triggers"] = [r["Name"] for r in trigger_result.get("records", [])]
+            apex_classes, apex_triggers = get_apex_sources(sf)
         except Exception as e:
-            result["usage"]["apex_triggers_error"] = str(e)
+            result["usage"]["apex_classes_error"] = result["usage"]["apex_triggers_error"] = str(e)
+        else:
+            folded_name = field_name.casefold()
+            result["usage"]["apex_classes"] = list(islice(
+                (name for name, body in apex_classes.items() if folded_name in body.casefold()), 10
+            ))
+            result["usage"]["apex_triggers"] = list(islice(
+                (name for name, body in apex_triggers.items() if folded_name in body.casefold()), 10
+            ))
 
-        return json.dumps(result, indent=2)
+        return _to_json(result)
 
     except Exception as e:
         import traceback
-        return json.dumps({
+        return _to_json({
             "success": False,
             "error": str(e),
             "traceback": traceback.format_exc()
-        }, indent=2)
+        })
+
+
+# Metadata categories reported for each field by analyze_field_usage
+_FIELD_USAGE_CATEGORIES = (
+    "apex_classes", "apex_triggers", "flows", "validation_rules", "formula_fields",
+    "workflow_rules", "page_layouts", "reports", "email_templates"
+)
+
+# Field API names consist of word characters only
+_WORD_RE = re.compile(r"\w+")
+
+
+class _SourceIndex:
+    """Inverted index from word tokens to the sources that contain them.
+
+    A name made of word characters can only occur inside a single word token
+    of a source, so searching the corpus of distinct tokens (far smaller than
+    the sources themselves) finds exactly the sources a substring scan would.
+    """
+
+    def __init__(self, sources: Dict[str, str]):
+        self.sources = sources
+        self.order = {name: position for position, name in enumerate(sources)}
+
+        token_sources: Dict[str, List[str]] = {}
+        for source_name, text in sources.items():
+            for token in set(_WORD_RE.findall(text)):
+                token_sources.setdefault(token, []).append(source_name)
+
+        tokens = list(token_sources)
+        self.postings = [token_sources[token] for token in tokens]
+        # Tokens are newline-separated so a name can never match across two of them
+        self.corpus = "\n".join(tokens)
+        self.starts = list(accumulate((len(token) + 1 for token in tokens[:-1]), initial=0))
+
+    def lookup(self, name: str) -> List[str]:
+        """Get the sources containing name, in source order."""
+        if not _WORD_RE.fullmatch(name):
+            return [source_name for source_name, text in self.sources.items() if name in text]
+
+        found = set()
+        pos = self.corpus.find(name)
+        while pos != -1:
+            token_idx = bisect_right(self.starts, pos) - 1
+            found.update(self.postings[token_idx])
+            if token_idx + 1 == len(self.starts):
+                break
+            pos = self.corpus.find(name, self.starts[token_idx + 1])
+        return sorted(found, key=self.order.__getitem__)
+
+
+def _searchable_sources(bundle: MetadataBundle) -> Dict[str, Dict[str, str]]:
+    """Get the text to search per category, keyed by component name.
+
+    Name categories are casefolded up front so case-insensitive checks are a
+    plain lookup of the casefolded field name.
+    """
+    return {
+        "apex_classes": bundle.apex_classes,
+        "apex_triggers": bundle.apex_triggers,
+        "flows": bundle.flows,
+        "flow_names": {name: name.casefold() for name in bundle.flows},
+        "validation_rules": {
+            vr_name: f"{vr_data['formula'] or ''}\n{vr_data['error_msg'] or ''}\n{vr_data['name']}"
+            for vr_name, vr_data in bundle.validation_rules.items()
+        },
+        "workflow_rules": {
+            name: f"{formula or ''}\n{name}" for name, formula in bundle.workflow_rules.items()
+        },
+        "reports": bundle.reports,
+        "report_names": {name: name.casefold() for name in bundle.reports},
+        "email_templates": bundle.email_templates
+    }
+
+
+def _get_source_indexes(bundle: MetadataBundle, sources: Dict[str, Dict[str, str]]) -> Dict[str, _SourceIndex]:
+    """Get token indexes for every category, built once per bundle.
+
+    The indexes are stored on the bundle itself, so a cached bundle reuses
+    them and a refetched bundle always starts with fresh ones.
+    """
+    indexes = bundle.source_indexes
+    if indexes is None:
+        indexes = {category: _SourceIndex(texts) for category, texts in sources.items()}
+        bundle.source_indexes = indexes
+    return indexes
+
+
+def _get_layout_index(bundle: MetadataBundle) -> Dict[str, List[str]]:
+    """Map each casefolded field name to the page layouts that contain it.
+
+    Stored on the bundle so the reverse map is built once per fetch.
+    """
+    if bundle.layout_index is not None:
+        return bundle.layout_index
+
+    layout_index: Dict[str, List[str]] = defaultdict(list)
+    for layout_name, field_list in bundle.layouts.items():
+        for field_in_layout in field_list:
+            layouts = layout_index[sys.intern(field_in_layout.casefold())]
+            if not layouts or layouts[-1] != layout_name:
+                layouts.append(layout_name)
+    layout_index = dict(layout_index)
+
+    bundle.layout_index = layout_index
+    return layout_index
+
+
+class _NameMatcher:
+    """Finds which sources contain each of a fixed list of names (case-sensitive).
+
+    Built once per scan and reused for every metadata category. Uses
+    Hyperscan or an Aho-Corasick automaton when installed - both scan a
+    source once for all names - and the token index otherwise. A single
+    name (analyze_field_usage with field_name) is a plain substring scan,
+    which is cheaper than building any of those.
+    """
+
+    def __init__(self, names: List[str]):
+        self.names = names
+        self._db = None
+        self._automaton = None
+        if len(names) < 2:
+            return
+
+        if HYPERSCAN_AVAILABLE:
+            # SINGLEMATCH reports each name at most once per source
+            self._db = hyperscan.Database()
+            self._db.compile(
+                expressions=[re.escape(name).encode() for name in names],
+                ids=list(range(len(names))),
+                elements=len(names),
+                flags=[hyperscan.HS_FLAG_SINGLEMATCH] * len(names)
+            )
+        elif AHOCORASICK_AVAILABLE:
+            self._automaton = ahocorasick.Automaton()
+            for name in names:
+                self._automaton.add_word(name, name)
+            self._automaton.make_automaton()
+
+    def match(self, sources: Dict[str, str], index: Optional[_SourceIndex] = None) -> Dict[str, List[str]]:
+        """Map each name to the sources whose text contains it, in source order."""
+        hits = {name: [] for name in self.names}
+        if not self.names or not sources:
+            return hits
+
+        if self._db is not None:
+            names = self.names
+
+            def on_match(name_id, start, end, flags, source_name):
+                hits[names[name_id]].append(source_name)
+
+            for source_name, text in sources.items():
+                self._db.scan(text.encode("utf-8"), match_event_handler=on_match, context=source_name)
+            return hits
+
+        if self._automaton is not None:
+            for source_name, text in sources.items():
+                found = set()
+                for _, name in self._automaton.iter(text):
+                    if name not in found:
+                        found.add(name)
+                        hits[name].append(source_name)
+            return hits
+
+        if index is None and len(self.names) == 1:
+            name = self.names[0]
+            hits[name] = [source_name for source_name, text in sources.items() if name in text]
+            return hits
+
+        index = index or _SourceIndex(sources)
+        for name in self.names:
+            hits[name] = index.lookup(name)
+        return hits
+
+
+def _merge_hits(order, *hit_lists: List[str]) -> List[str]:
+    """Union several hit lists, keeping the source order."""
+    if not any(hit_lists[1:]):
+        return hit_lists[0]
+    found = set().union(*hit_lists)
+    return [name for name in order if name in found]
+
+
+def _scan_fields(
+    fields: List[dict],
+    bundle: MetadataBundle,
+    describe_fields: list,
+    join_lists: bool = False
+) -> Iterator[dict]:
+    """Scan all fields in order.
+
+    Rows are yielded one field at a time so callers can write them out
+    without holding every result; only the per-category hit lists are
+    built up front. With join_lists, each row also carries its comma-joined
+    CSV cells under "_joined", so the joins happen once per row.
+    """
+    # Searchable text and token indexes are built once per bundle.
+    # A single field is scanned directly, so it never builds the indexes
+    sources = _searchable_sources(bundle)
+    scans_sources = HYPERSCAN_AVAILABLE or AHOCORASICK_AVAILABLE or len(fields) == 1
+    indexes = {} if scans_sources else _get_source_indexes(bundle, sources)
+
+    # Formulas come from this describe call, not the cached bundle, so they
+    # are indexed per scan
+    sources = dict(sources, formula_fields={
+        f["name"]: f["calculatedFormula"] for f in describe_fields if f.get("calculatedFormula")
+    })
+    if not scans_sources:
+        indexes = dict(indexes, formula_fields=_SourceIndex(sources["formula_fields"]))
+    layout_index = _get_layout_index(bundle)
+
+    # Interned names let dict lookups hit the identity fast path
+    names = [sys.intern(field["name"]) for field in fields]
+    folded_names = [sys.intern(name.casefold()) for name in names]
+
+    name_matcher = _NameMatcher(names)
+    folded_matcher = _NameMatcher(folded_names)
+
+    def match(matcher: _NameMatcher, category: str) -> Dict[str, List[str]]:
+        return matcher.match(sources[category], indexes.get(category))
+
+    # Look up each metadata category once for every field
+    apex_hits = match(name_matcher, "apex_classes")
+    trigger_hits = match(name_matcher, "apex_triggers")
+    flow_hits = match(name_matcher, "flows")
+    flow_name_hits = match(folded_matcher, "flow_names")
+    vr_hits = match(name_matcher, "validation_rules")
+    formula_hits = match(name_matcher, "formula_fields")
+    wf_hits = match(name_matcher, "workflow_rules")
+    report_hits = match(name_matcher, "reports")
+    report_name_hits = match(folded_matcher, "report_names")
+    email_hits = match(name_matcher, "email_templates")
+
+    # Checked once per scan so the per-field debug messages cost nothing when off
+    debug = logger.isEnabledFor(logging.DEBUG)
+
+    for field, field_api_name, folded_name in zip(fields, names, folded_names):
+        usage_data = {
+            "field_name": field_api_name,
+            "field_label": field["label"],
+            "field_type": field["type"],
+            "is_custom": field.get("custom", False),
+            "is_required": not field.get("nillable", True),
+            "apex_classes": apex_hits[field_api_name],
+            "apex_triggers": trigger_hits[field_api_name],
+            "flows": _merge_hits(bundle.flows, flow_hits[field_api_name], flow_name_hits[folded_name]),
+            "validation_rules": vr_hits[field_api_name],
+            "formula_fields": formula_hits[field_api_name],
+            "workflow_rules": wf_hits[field_api_name],
+            "page_layouts": [],
+            "email_templates": email_hits[field_api_name],
+            "reports": _merge_hits(bundle.reports, report_hits[field_api_name], report_name_hits[folded_name]),
+            "total_usage": 0
+        }
+
+        # Check Page Layouts - case-insensitive lookup in the reverse map
+        layouts_with_field = layout_index.get(folded_name, [])
+        usage_data["page_layouts"] = layouts_with_field
+
+        if debug:
+            if not usage_data["flows"] and bundle.flows:
+                logger.debug(f"✗ {field_api_name} not found in any of {len(bundle.flows)} flows")
+                logger.debug(f"   Sample flow names: {list(islice(bundle.flows, 3))}")
+
+            if not layouts_with_field and bundle.layouts:
+                logger.debug(f"✗ {field_api_name} not found in any of {len(bundle.layouts)} page layouts")
+                # Show first layout's fields for debugging
+                first_layout = next(iter(bundle.layouts.items()))
+                logger.debug(f"   Sample layout '{first_layout[0]}' has {len(first_layout[1])} fields: {first_layout[1][:5]}")
+
+            if not usage_data["email_templates"] and bundle.email_templates:
+                logger.debug(f"✗ {field_api_name} not found in any of {len(bundle.email_templates)} email templates")
+
+        # Count each category once; the CSV and summary reuse these counts
+        counts = {category: len(usage_data[category]) for category in _FIELD_USAGE_CATEGORIES}
+        usage_data["total_usage"] = total_usage = sum(counts.values())
+        usage_data["is_referenced"] = total_usage > 0
+        usage_data["_counts"] = counts
+        if join_lists:
+            usage_data["_joined"] = {category: ", ".join(usage_data[category]) for category in counts}
+
+        yield usage_data
+
+
+# CSV text for False/True flags, indexed by the flag
+_YES_NO = ("No", "Yes")
 
 
 @register_tool
@@ -434,7 +868,9 @@ def analyze_field_usage(
 
     This tool analyzes field usage across Apex Classes, Triggers, Flows, Validation Rules,
     Formula Fields, Workflow Rules, Page Layouts, Email Templates, and optionally Reports.
-    Perfect for field audit, cleanup, and impact analysis.
+    Perfect for field audit, cleanup, and impact analysis. Managed-package Apex
+    (classes and triggers with a NamespacePrefix) is skipped - it is read-only
+    and its body is usually hidden.
 
     Added by Sameer
 
@@ -496,7 +932,7 @@ def analyze_field_usage(
             # Single field analysis
             fields_to_analyze = [f for f in describe["fields"] if f["name"] == field_name]
             if not fields_to_analyze:
-                return json.dumps({
+                return _to_json({
                     "success": False,
                     "error": f"Field '{field_name}' not found on object '{object_name}'"
                 })
@@ -509,402 +945,14 @@ def analyze_field_usage(
 
         # ===================================================================
         # PERFORMANCE OPTIMIZATION: Fetch ALL metadata ONCE, then check fields
-        # This reduces API calls from (fields × 8) to just ~8 total queries!
+        # This reduces API calls from (fields × 8) to just ~8 total queries,
+        # and the bundle is cached so repeat calls skip the downloads entirely
         # ===================================================================
-
-        # Cache storage for all metadata
-        metadata_cache = {
-            "apex_classes": {},
-            "apex_triggers": {},
-            "flows": {},
-            "validation_rules": {},
-            "workflow_rules": {},
-            "layouts": {},
-            "reports": {},
-            "email_templates": {}
-        }
-
-        # 1. Fetch ALL Apex Classes (ONCE)
-        try:
-            logger.info("Fetching all Apex Classes...")
-            apex_query = "SELECT Id, Name, Body FROM ApexClass"
-            apex_result = sf.query_all(apex_query)
-            for apex in apex_result.get("records", []):
-                metadata_cache["apex_classes"][apex["Name"]] = apex.get("Body", "")
-            logger.info(f"  ✓ Cached {len(metadata_cache['apex_classes'])} Apex classes")
-        except Exception as e:
-            logger.warning(f"Error fetching Apex Classes: {e}")
-
-        # 2. Fetch ALL Apex Triggers (ONCE)
-        try:
-            logger.info("Fetching all Apex Triggers...")
-            trigger_query = "SELECT Id, Name, Body FROM ApexTrigger"
-            trigger_result = sf.query_all(trigger_query)
-            for trigger in trigger_result.get("records", []):
-                metadata_cache["apex_triggers"][trigger["Name"]] = trigger.get("Body", "")
-            logger.info(f"  ✓ Cached {len(metadata_cache['apex_triggers'])} triggers")
-        except Exception as e:
-            logger.warning(f"Error fetching Triggers: {e}")
-
-        # 3. Fetch ALL Active Flows (ONCE) - Get actual flow content via Tooling API
-        try:
-            logger.info("Fetching all active Flows via Tooling API...")
-            # Query Flow objects to get latest active versions
-            flow_query = "SELECT Id, Definition.DeveloperName, Status FROM Flow WHERE Status = 'Active'"
-            flow_result = sf.restful("tooling/query", params={'q': flow_query})
-
-            for flow in flow_result.get("records", []):
-                flow_id = flow.get("Id", "")
-                # Get DeveloperName from Definition object
-                definition = flow.get("Definition", {})
-                flow_api_name = definition.get("DeveloperName", "") if definition else ""
-
-                # Try to get flow metadata to check for field references
-                try:
-                    # Fetch the flow's full definition which contains field references
-                    flow_detail = sf.restful(f"tooling/sobjects/Flow/{flow_id}")
-                    metadata = flow_detail.get("Metadata", {})
-                    flow_label = metadata.get("label", flow_api_name)
-
-                    # Combine all searchable content including metadata
-                    metadata_str = str(metadata)
-                    flow_content = f"{flow_label} {flow_api_name} {metadata_str}"
-
-                except Exception:
-                    # If metadata fetch fails, use basic info
-                    logger.debug(f"Could not fetch full metadata for flow {flow_api_name}, using basic info")
-                    flow_content = flow_api_name
-                    flow_label = flow_api_name
-
-                metadata_cache["flows"][flow_label or flow_api_name] = flow_content
-                logger.debug(f"Cached flow: {flow_label}")
-
-            logger.info(f"  ✓ Cached {len(metadata_cache['flows'])} active flows")
-        except Exception as e:
-            logger.warning(f"Error fetching Flows: {e}")
-
-        # 4. Fetch ALL Validation Rules for this object (ONCE)
-        try:
-            logger.info("Fetching all Validation Rules...")
-            # First query: Get ValidationName and Id only (ErrorConditionFormula is not directly queryable)
-            vr_query = f"""
-                SELECT ValidationName, Id
-                FROM ValidationRule
-                WHERE EntityDefinition.QualifiedApiName = '{object_name}' AND Active = true
-            """
-            vr_result = sf.restful("tooling/query", params={'q': vr_query})
-
-            # Second step: Fetch full record with Metadata for each validation rule
-            for rec in vr_result.get("records", []):
-                vr_id = rec.get("Id")
-                vr_name = rec.get("ValidationName")
-
-                # Get full record with Metadata
-                try:
-                    detail = sf.restful(f"tooling/sobjects/ValidationRule/{vr_id}")
-                    metadata = detail.get("Metadata") or {}
-                    formula = metadata.get("errorConditionFormula", "")
-                    error_msg = metadata.get("errorMessage", "")
-
-                    metadata_cache["validation_rules"][vr_name] = {
-                        "formula": formula,
-                        "error_msg": error_msg,
-                        "name": vr_name
-                    }
-                except Exception as detail_error:
-                    logger.warning(f"Error fetching details for validation rule {vr_name}: {detail_error}")
-
-            logger.info(f"  ✓ Cached {len(metadata_cache['validation_rules'])} validation rules")
-        except Exception as e:
-            logger.warning(f"Error fetching Validation Rules: {e}")
-
-        # 5. Fetch ALL Workflow Rules for this object (ONCE)
-        try:
-            logger.info("Fetching all Workflow Rules...")
-            # First query: Get Id and Name only (Formula is not directly queryable)
-            wf_query = f"""
-                SELECT Id, Name
-                FROM WorkflowRule
-                WHERE TableEnumOrId = '{object_name}' AND IsActive = true
-            """
-            wf_result = sf.restful("tooling/query", params={'q': wf_query})
-
-            # Second step: Fetch full record with Metadata for each workflow rule
-            for rec in wf_result.get("records", []):
-                wf_id = rec.get("Id")
-                wf_name = rec.get("Name")
-
-                # Get full record with Metadata
-                try:
-                    detail = sf.restful(f"tooling/sobjects/WorkflowRule/{wf_id}")
-                    metadata = detail.get("Metadata") or {}
-                    formula = metadata.get("formula", "")
-
-                    metadata_cache["workflow_rules"][wf_name] = formula
-                except Exception as detail_error:
-                    logger.warning(f"Error fetching details for workflow rule {wf_name}: {detail_error}")
-
-            logger.info(f"  ✓ Cached {len(metadata_cache['workflow_rules'])} workflow rules")
-        except Exception as e:
-            logger.warning(f"Error fetching Workflow Rules: {e}")
-
-        # 6. Fetch ALL Page Layouts for this object (ONCE)
-        try:
-            logger.info(f"Fetching all Page Layouts for {object_name}...")
-            # First query: Get Id, Name, and EntityDefinitionId
-            # Note: We'll filter by object after fetching to ensure we only get layouts for this object
-            layout_query = f"""
-                SELECT Id, Name, EntityDefinitionId, EntityDefinition.QualifiedApiName
-                FROM Layout
-                WHERE EntityDefinition.QualifiedApiName = '{object_name}'
-            """
-            layout_result = sf.restful("tooling/query", params={'q': layout_query})
-
-            layouts_for_object = layout_result.get("records", [])
-            logger.info(f"Found {len(layouts_for_object)} layouts for {object_name}")
-
-            # Second step: Fetch full record with Metadata for each layout
-            for layout in layouts_for_object:
-                layout_id = layout.get("Id")
-                layout_name = layout.get("Name")
-
-                try:
-                    # Get full record with Metadata
-                    layout_detail = sf.restful(f"tooling/sobjects/Layout/{layout_id}")
-                    metadata = layout_detail.get("Metadata", {})
-
-                    # Extract field names from layout sections
-                    field_names = []
-                    layout_sections = metadata.get("layoutSections", [])
-                    for section in layout_sections:
-                        layout_columns = section.get("layoutColumns", [])
-                        for column in layout_columns:
-                            layout_items = column.get("layoutItems", [])
-                            for item in layout_items:
-                                field_name = item.get("field")
-                                if field_name:
-                                    field_names.append(field_name.strip())
-
-                    metadata_cache["layouts"][layout_name] = field_names
-                    logger.debug(f"Cached layout '{layout_name}' with {len(field_names)} fields")
-                except Exception as layout_err:
-                    logger.debug(f"Error fetching metadata for layout {layout_name}: {layout_err}")
-                    metadata_cache["layouts"][layout_name] = []
-
-            logger.info(f"  ✓ Cached {len(metadata_cache['layouts'])} page layouts for {object_name}")
-        except Exception as e:
-            logger.warning(f"Error fetching Page Layouts: {e}")
-
-        # 7. Fetch ALL Reports (LIMITED) (ONCE) - OPTIONAL (only if requested)
-        if include_reports:
-            try:
-                logger.info("Fetching reports (limited to 50 for performance)...")
-                report_query = "SELECT Id, Name FROM Report LIMIT 50"
-                report_result = sf.query_all(report_query)
-
-                report_count = 0
-                for report in report_result.get("records", []):
-                    if report_count >= 50:  # Hard limit to prevent timeout
-                        break
-
-                    report_id = report["Id"]
-                    report_name = report["Name"]
-
-                    try:
-                        # Get report metadata (with timeout protection)
-                        report_describe = sf.restful(f'analytics/reports/{report_id}/describe')
-                        if report_describe:
-                            report_metadata = report_describe.get("reportMetadata", {})
-                            # Store all columns/fields in this report
-                            all_fields = []
-                            all_fields.extend(report_metadata.get("detailColumns", []))
-
-                            for agg in report_metadata.get("aggregates", []):
-                                all_fields.append(str(agg))
-
-                            for group in report_metadata.get("groupingsDown", []) + report_metadata.get("groupingsAcross", []):
-                                all_fields.append(str(group))
-
-                            for rf in report_metadata.get("reportFilters", []):
-                                all_fields.append(rf.get("column", ""))
-
-                            metadata_cache["reports"][report_name] = " ".join(all_fields)
-                            report_count += 1
-                    except Exception as e:
-                        # Skip problematic reports
-                        logger.debug(f"Skipping report {report_name}: {e}")
-                        metadata_cache["reports"][report_name] = report_name
-
-                logger.info(f"  ✓ Cached {len(metadata_cache['reports'])} reports")
-            except Exception as e:
-                logger.warning(f"Error fetching Reports (continuing without report analysis): {e}")
-                # Continue without reports - don't fail the whole analysis
-        else:
-            logger.info("  ⊘ Skipping reports (include_reports=False) - use include_reports=True to analyze reports")
-
-        # 8. Fetch ALL Email Templates (ONCE) - Always fetch
-        try:
-            logger.info("Fetching all Email Templates...")
-            # Query EmailTemplate - check HtmlValue, Body, Subject, BrandTemplateId
-            email_query = """
-                SELECT Id, Name, DeveloperName, Subject, HtmlValue, Body
-                FROM EmailTemplate
-                WHERE IsActive = true
-                LIMIT 500
-            """
-            email_result = sf.query_all(email_query)
-            for email in email_result.get("records", []):
-                email_name = email.get("Name") or email.get("DeveloperName", "Unknown")
-                # Combine all searchable content
-                email_content = " ".join([
-                    email.get("Subject", ""),
-                    email.get("HtmlValue", ""),
-                    email.get("Body", ""),
-                    email.get("DeveloperName", "")
-                ])
-                metadata_cache["email_templates"][email_name] = email_content
-                logger.debug(f"Cached email template: {email_name}")
-            logger.info(f"  ✓ Cached {len(metadata_cache['email_templates'])} email templates")
-        except Exception as e:
-            logger.warning(f"Error fetching Email Templates: {e}")
+        bundle = get_metadata_bundle(sf, object_name, include_reports)
 
         logger.info(f"✓ All metadata cached! Now analyzing {len(fields_to_analyze)} fields against cached data...")
 
-        # Results storage
-        field_usage_results = []
-
-        # Process each field (NOW FAST - just checking against cached data!)
-        for idx, field in enumerate(fields_to_analyze, 1):
-            field_api_name = field["name"]
-            if idx % 50 == 0:  # Progress every 50 fields
-                logger.info(f"Progress: [{idx}/{len(fields_to_analyze)}] fields analyzed")
-
-            usage_data = {
-                "field_name": field_api_name,
-                "field_label": field["label"],
-                "field_type": field["type"],
-                "is_custom": field.get("custom", False),
-                "is_required": not field.get("nillable", True),
-                "apex_classes": [],
-                "apex_triggers": [],
-                "flows": [],
-                "validation_rules": [],
-                "formula_fields": [],
-                "workflow_rules": [],
-                "page_layouts": [],
-                "email_templates": [],
-                "reports": [],
-                "total_usage": 0
-            }
-
-            # 1. Check Apex Classes (from cache)
-            usage_data["apex_classes"] = [
-                name for name, body in metadata_cache["apex_classes"].items()
-                if field_api_name in body
-            ]
-
-            # 2. Check Apex Triggers (from cache)
-            usage_data["apex_triggers"] = [
-                name for name, body in metadata_cache["apex_triggers"].items()
-                if field_api_name in body
-            ]
-
-            # 3. Check Flows (from cache)
-            flows_with_field = []
-            for flow_name, flow_data in metadata_cache["flows"].items():
-                if field_api_name in flow_data or field_api_name.lower() in flow_name.lower():
-                    flows_with_field.append(flow_name)
-                    logger.debug(f"✓ Found {field_api_name} in Flow: {flow_name}")
-
-            if not flows_with_field and metadata_cache["flows"]:
-                logger.debug(f"✗ {field_api_name} not found in any of {len(metadata_cache['flows'])} flows")
-                logger.debug(f"   Sample flow names: {list(metadata_cache['flows'].keys())[:3]}")
-
-            usage_data["flows"] = flows_with_field
-
-            # 4. Check Validation Rules (from cache)
-            vr_using_field = []
-            for vr_name, vr_data in metadata_cache["validation_rules"].items():
-                if (field_api_name in vr_data["formula"] or
-                    field_api_name in vr_data["error_msg"] or
-                    field_api_name in vr_data["name"]):
-                    vr_using_field.append(vr_name)
-            usage_data["validation_rules"] = vr_using_field
-
-            # 5. Check Formula Fields (fields that reference this field)
-            try:
-                formula_fields = [
-                    f["name"] for f in describe["fields"]
-                    if f.get("calculatedFormula") and field_api_name in f.get("calculatedFormula", "")
-                ]
-                usage_data["formula_fields"] = formula_fields
-            except Exception as e:
-                logger.warning(f"Error checking Formula Fields for {field_api_name}: {e}")
-
-            # 6. Check Workflow Rules (from cache)
-            usage_data["workflow_rules"] = [
-                name for name, formula in metadata_cache["workflow_rules"].items()
-                if field_api_name in formula or field_api_name in name
-            ]
-
-            # 7. Check Page Layouts (from cache) - IMPROVED MATCHING
-            layouts_with_field = []
-            for layout_name, field_list in metadata_cache["layouts"].items():
-                # Check for exact match or case-insensitive match
-                for field_in_layout in field_list:
-                    if (field_api_name == field_in_layout or
-                        field_api_name.lower() == field_in_layout.lower()):
-                        layouts_with_field.append(layout_name)
-                        logger.debug(f"✓ Found {field_api_name} in layout: {layout_name}")
-                        break
-
-            if not layouts_with_field and metadata_cache["layouts"]:
-                logger.debug(f"✗ {field_api_name} not found in any of {len(metadata_cache['layouts'])} page layouts")
-                # Show first layout's fields for debugging
-                if metadata_cache["layouts"]:
-                    first_layout = list(metadata_cache["layouts"].items())[0]
-                    logger.debug(f"   Sample layout '{first_layout[0]}' has {len(first_layout[1])} fields: {first_layout[1][:5]}")
-
-            usage_data["page_layouts"] = layouts_with_field
-
-            # 8. Check Reports (from cache)
-            usage_data["reports"] = [
-                report_name for report_name, report_data in metadata_cache["reports"].items()
-                if field_api_name in report_data or field_api_name.lower() in report_name.lower()
-            ]
-
-            # 9. Check Email Templates (from cache) - NEW!
-            email_templates_with_field = []
-            for email_name, email_content in metadata_cache["email_templates"].items():
-                if field_api_name in email_content:
-                    email_templates_with_field.append(email_name)
-                    logger.debug(f"✓ Found {field_api_name} in Email Template: {email_name}")
-
-            if not email_templates_with_field and metadata_cache["email_templates"]:
-                logger.debug(f"✗ {field_api_name} not found in any of {len(metadata_cache['email_templates'])} email templates")
-
-            usage_data["email_templates"] = email_templates_with_field
-
-            # Calculate total usage
-            usage_data["total_usage"] = (
-                len(usage_data["apex_classes"]) +
-                len(usage_data["apex_triggers"]) +
-                len(usage_data["flows"]) +
-                len(usage_data["validation_rules"]) +
-                len(usage_data["formula_fields"]) +
-                len(usage_data["workflow_rules"]) +
-                len(usage_data["page_layouts"]) +
-                len(usage_data["reports"]) +
-                len(usage_data["email_templates"])
-            )
-
-            usage_data["is_referenced"] = usage_data["total_usage"] > 0
-
-            field_usage_results.append(usage_data)
-
-        logger.info(f"✓ Completed analysis of {len(field_usage_results)} fields!")
-
-        # Generate CSV if requested
+        # Resolve the CSV path up front so rows can be written as fields are scanned
         csv_file_path = None
         if export_to_csv:
             # Create Documents folder if it doesn't exist
@@ -922,7 +970,16 @@ def analyze_field_usage(
                 # If full path provided, use it as-is
                 csv_file_path = os.path.abspath(output_file)
 
-            with open(csv_file_path, 'w', newline='', encoding='utf-8') as csvfile:
+        # Only the JSON preview and running totals are kept in memory
+        preview_results = []
+        total_fields = 0
+        total_referenced = 0
+        totals = dict.fromkeys(_FIELD_USAGE_CATEGORIES, 0)
+
+        csv_context = open(csv_file_path, 'w', newline='', encoding='utf-8') if csv_file_path else nullcontext()
+        with csv_context as csvfile:
+            writer = None
+            if csvfile:
                 fieldnames = [
                     'Field Name',
                     'Field Label',
@@ -951,73 +1008,84 @@ def analyze_field_usage(
                     'Is Referenced'
                 ]
 
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                writer.writeheader()
-
-                for result in field_usage_results:
-                    writer.writerow({
-                        'Field Name': result['field_name'],
-                        'Field Label': result['field_label'],
-                        'Field Type': result['field_type'],
-                        'Is Custom': 'Yes' if result['is_custom'] else 'No',
-                        'Is Required': 'Yes' if result['is_required'] else 'No',
-                        'Apex Classes Count': len(result['apex_classes']),
-                        'Apex Classes': ', '.join(result['apex_classes']),
-                        'Triggers Count': len(result['apex_triggers']),
-                        'Triggers': ', '.join(result['apex_triggers']),
-                        'Flows Count': len(result['flows']),
-                        'Flows': ', '.join(result['flows']),
-                        'Validation Rules Count': len(result['validation_rules']),
-                        'Validation Rules': ', '.join(result['validation_rules']),
-                        'Formula Fields Count': len(result['formula_fields']),
-                        'Formula Fields': ', '.join(result['formula_fields']),
-                        'Workflow Rules Count': len(result['workflow_rules']),
-                        'Workflow Rules': ', '.join(result['workflow_rules']),
-                        'Page Layouts Count': len(result['page_layouts']),
-                        'Page Layouts': ', '.join(result['page_layouts']),
-                        'Email Templates Count': len(result['email_templates']),
-                        'Email Templates': ', '.join(result['email_templates']),
-                        'Reports Count': len(result['reports']),
-                        'Reports': ', '.join(result['reports']),
-                        'Total Usage Count': result['total_usage'],
-                        'Is Referenced': 'Yes' if result['is_referenced'] else 'No'
-                    })
-
+                writer = csv.writer(csvfile)
+                writer.writerow(fieldnames)
+
+            # Check every field against the cached metadata
+            for result in _scan_fields(fields_to_analyze, bundle, describe["fields"], join_lists=bool(writer)):
+                counts = result.pop('_counts')
+                if writer:
+                    joined = result.pop('_joined')
+                    # Positional row in fieldnames order
+                    writer.writerow((
+                        result['field_name'],
+                        result['field_label'],
+                        result['field_type'],
+                        _YES_NO[bool(result['is_custom'])],
+                        _YES_NO[bool(result['is_required'])],
+                        counts['apex_classes'],
+                        joined['apex_classes'],
+                        counts['apex_triggers'],
+                        joined['apex_triggers'],
+                        counts['flows'],
+                        joined['flows'],
+                        counts['validation_rules'],
+                        joined['validation_rules'],
+                        counts['formula_fields'],
+                        joined['formula_fields'],
+                        counts['workflow_rules'],
+                        joined['workflow_rules'],
+                        counts['page_layouts'],
+                        joined['page_layouts'],
+                        counts['email_templates'],
+                        joined['email_templates'],
+                        counts['reports'],
+                        joined['reports'],
+                        result['total_usage'],
+                        _YES_NO[result['is_referenced']]
+                    ))
+
+                total_fields += 1
+                total_referenced += result['is_referenced']
+                for category in totals:
+                    totals[category] += counts[category]
+                if len(preview_results) < 10:
+                    preview_results.append(result)
+
+        logger.info(f"✓ Completed analysis of {total_fields} fields!")
+        if csv_file_path:
             logger.info(f"CSV exported to: {csv_file_path}")
 
-        # Summary statistics
-        total_referenced = sum(1 for r in field_usage_results if r['is_referenced'])
-        total_unreferenced = len(field_usage_results) - total_referenced
-
-        return json.dumps({
+        return _to_json({
             "success": True,
             "object": object_name,
             "field_analyzed": field_name if field_name else "ALL",
-            "total_fields_analyzed": len(field_usage_results),
+            "total_fields_analyzed": total_fields,
             "summary": {
                 "referenced_fields": total_referenced,
-                "unreferenced_fields": total_unreferenced,
-                "total_apex_classes": sum(len(r["apex_classes"]) for r in field_usage_results),
-                "total_triggers": sum(len(r["apex_triggers"]) for r in field_usage_results),
-                "total_flows": sum(len(r["flows"]) for r in field_usage_results),
-                "total_validation_rules": sum(len(r["validation_rules"]) for r in field_usage_results),
-                "total_formula_fields": sum(len(r["formula_fields"]) for r in field_usage_results),
-                "total_workflow_rules": sum(len(r["workflow_rules"]) for r in field_usage_results),
-                "total_page_layouts": sum(len(r["page_layouts"]) for r in field_usage_results),
-                "total_email_templates": sum(len(r["email_templates"]) for r in field_usage_results),
-                "total_reports": sum(len(r["reports"]) for r in field_usage_results)
+                "unreferenced_fields": total_fields - total_referenced,
+                "total_apex_classes": totals["apex_classes"],
+                "total_triggers": totals["apex_triggers"],
+                "total_flows": totals["flows"],
+                "total_validation_rules": totals["validation_rules"],
+                "total_formula_fields": totals["formula_fields"],
+                "total_workflow_rules": totals["workflow_rules"],
+                "total_page_layouts": totals["page_layouts"],
+                "total_email_templates": totals["email_templates"],
+                "total_reports": totals["reports"]
             },
+            "unavailable_sources": bundle.unavailable,
             "csv_file": csv_file_path,
-            "field_usage_details": field_usage_results[:10] if len(field_usage_results) > 10 else field_usage_results,
+            "field_usage_details": preview_results,
             "note": "Full results exported to CSV. Only first 10 results shown in JSON to avoid token limits."
-        }, indent=2)
+        })
 
     except Exception as e:
         logger.exception("analyze_field_usage failed")
         import traceback
-        return json.dumps({
+        return _to_json({
             "success": False,
             "error": str(e),
             "error_type": type(e).__name__,
             "traceback": traceback.format_exc()
-        }, indent=2)
+        })
@@ -1,5 +1,7 @@
 """Salesforce connection management with OAuth support"""
 from simple_salesforce import Salesforce
+import requests
+from requests.adapters import HTTPAdapter
 import threading
 import time
 import logging
@@ -19,6 +21,30 @@ except ImportError:
 # Thread-local storage
 local = threading.local()
 
+# Shared HTTP adapter - its urllib3 pool is thread-safe, so every connection
+# reuses keep-alive sockets instead of paying a fresh TLS handshake
+_http_adapter = None
+_http_adapter_lock = threading.Lock()
+
+
+def _new_http_session() -> requests.Session:
+    """Create a Session for one Salesforce connection, backed by the shared adapter.
+
+    Sessions are not thread-safe and carry cookies and headers, so each
+    connection (and therefore each thread and org) gets its own. They must not
+    be closed individually - that would close the shared adapter's pool.
+    """
+    global _http_adapter
+    if _http_adapter is None:
+        with _http_adapter_lock:
+            if _http_adapter is None:
+                _http_adapter = HTTPAdapter(pool_connections=20, pool_maxsize=20)
+    session = requests.Session()
+    session.mount("https://", _http_adapter)
+    session.mount("http://", _http_adapter)
+    return session
+
+
 def get_salesforce_connection(user_id: str = None):
     """
     Get Salesforce connection using OAuth tokens (no config required).
@@ -78,7 +104,8 @@ def get_salesforce_connection(user_id: str = None):
         # Create connection
         local.sf_connection = Salesforce(
             instance_url=token_data['instance_url'],
-            session_id=token_data['access_token']
+            session_id=token_data['access_token'],
+            session=_new_http_session()
         )
 
         logger.info(f"✅ Connected to {token_data['instance_url']} as user {selected_user}")
@@ -43,6 +43,7 @@ from app.utils.pagination import (
     PaginatedResponse,
     paginate_list,
     paginate_from_cursor,
+    iter_pages,
     create_paginated_response,
     encode_cursor,
     decode_cursor,
@@ -60,6 +61,7 @@ from app.utils.connection_pool import (
     update_pooled_connection,
     remove_pooled_connection,
     get_pool_stats,
+    get_pool_summary_stats,
     cleanup_pool,
 )
 
@@ -99,6 +101,7 @@ __all__ = [
     'PaginatedResponse',
     'paginate_list',
     'paginate_from_cursor',
+    'iter_pages',
     'create_paginated_response',
     'encode_cursor',
     'decode_cursor',
@@ -114,5 +117,6 @@ __all__ = [
     'update_pooled_connection',
     'remove_pooled_connection',
     'get_pool_stats',
+    'get_pool_summary_stats',
     'cleanup_pool',
 ]
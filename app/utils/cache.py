@@ -10,30 +10,48 @@ Provides thread-safe caching for:
 
 Created by Sameer
 """
+import os
+import re
+import sys
 import time
+import fnmatch
 import threading
 import logging
-from typing import Any, Optional, Dict, Callable, TypeVar, Generic
+from typing import Any, Optional, Dict, Callable, Iterable, Set, Tuple, TypeVar, Generic
 from functools import wraps
 from dataclasses import dataclass, field
-from collections import OrderedDict
 
 logger = logging.getLogger(__name__)
 
 T = TypeVar('T')
 
+# Characters that make an invalidate_pattern() pattern a glob
+_WILDCARD_CHARS = frozenset('*?[')
 
-@dataclass
+# fnmatch.fnmatch normcases both sides, which makes globs case-insensitive on Windows
+_GLOB_FLAGS = re.IGNORECASE if os.name == 'nt' else 0
+
+# Objects a SOQL query reads from, including subqueries
+_SOQL_FROM_RE = re.compile(r"\bFROM\s+(\w+)", re.IGNORECASE)
+
+# Relationship paths (SELECT Account.Name FROM Contact) reach objects the
+# FROM clauses don't name
+_SOQL_PATH_RE = re.compile(r"\w\.\w")
+
+
+@dataclass(slots=True)
 class CacheEntry:
-    """Single cache entry with value and metadata"""
+    """Single cache entry with value and metadata (slotted - no per-entry __dict__)"""
     value: Any
     created_at: float
     ttl: float
     hits: int = 0
 
-    def is_expired(self) -> bool:
-        """Check if entry has expired"""
-        return time.time() - self.created_at > self.ttl
+    def is_expired(self, now: Optional[float] = None) -> bool:
+        """Check if entry has expired (now: time.monotonic() snapshot for bulk checks)"""
+        if now is None:
+            now = time.monotonic()
+        return now - self.created_at > self.ttl
 
     def touch(self):
         """Increment hit counter"""
@@ -58,6 +76,7 @@ class GlobalCache:
         'field_definitions': 600,  # 10 minutes
         'validation_rules': 300,   # 5 minutes
         'apex_classes': 300,       # 5 minutes
+        'metadata_bundle': 300,    # 5 minutes
         'query_results': 60,       # 1 minute
         'org_info': 3600,          # 1 hour
         'default': 300             # 5 minutes
@@ -73,13 +92,34 @@ class GlobalCache:
             'misses': 0,
             'evictions': 0
         }
+        # Secondary index of 'query_results' keys by object (casefolded)
+        self._query_by_object: Dict[str, Set[str]] = {}
+        self._query_objects: Dict[str, Tuple[str, ...]] = {}
+        # 'query_results' keys the index can't fully describe (matched by substring)
+        self._unindexed_queries: Set[str] = set()
 
     def _get_category_cache(self, category: str) -> Dict[str, CacheEntry]:
-        """Get or create cache dict for a category"""
+        """Get or create cache dict for a category (insertion order is LRU order)"""
         if category not in self._cache:
-            self._cache[category] = OrderedDict()
+            self._cache[category] = {}
         return self._cache[category]
 
+    def _remove(self, category: str, cache: Dict[str, CacheEntry], key: str) -> None:
+        """Delete an entry and drop it from the query index (caller holds the lock)"""
+        del cache[key]
+        if category == 'query_results':
+            self._unindex_query(key)
+
+    def _unindex_query(self, key: str) -> None:
+        """Drop a query key from the object index (caller holds the lock)"""
+        self._unindexed_queries.discard(key)
+        for object_name in self._query_objects.pop(key, ()):
+            keys = self._query_by_object.get(object_name)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._query_by_object[object_name]
+
     def get(self, category: str, key: str) -> Optional[Any]:
         """
         Get value from cache.
@@ -91,6 +131,25 @@ class GlobalCache:
         Returns:
             Cached value or None if not found/expired
         """
+        # Fast path: hits read without the lock (single dict lookups are atomic
+        # under the GIL); misses and expiry fall through to the locked path
+        cache = self._cache.get(category)
+        entry = cache.get(key) if cache is not None else None
+        if entry is not None and not entry.is_expired():
+            entry.hits = hits = entry.hits + 1
+            # Hit statistics are best-effort; they are not worth a lock per read
+            self._stats['hits'] += 1
+
+            # Refresh LRU position every 16th hit instead of on every read
+            if hits & 15 == 0:
+                with self._lock:
+                    if cache.get(key) is entry:
+                        del cache[key]
+                        cache[key] = entry
+
+            logger.debug(f"Cache hit: {category}/{key}")
+            return entry.value
+
         with self._lock:
             cache = self._get_category_cache(category)
             entry = cache.get(key)
@@ -100,19 +159,25 @@ class GlobalCache:
                 return None
 
             if entry.is_expired():
-                del cache[key]
+                self._remove(category, cache, key)
                 self._stats['misses'] += 1
                 logger.debug(f"Cache expired: {category}/{key}")
                 return None
 
-            # Move to end for LRU
-            cache.move_to_end(key)
+            # Another thread stored the entry after the fast-path check
             entry.touch()
             self._stats['hits'] += 1
             logger.debug(f"Cache hit: {category}/{key}")
             return entry.value
 
-    def set(self, category: str, key: str, value: Any, ttl: Optional[float] = None) -> None:
+    def set(
+        self,
+        category: str,
+        key: str,
+        value: Any,
+        ttl: Optional[float] = None,
+        objects: Optional[Iterable[str]] = None
+    ) -> None:
         """
         Set value in cache.
 
@@ -121,7 +186,14 @@ class GlobalCache:
             key: Cache key
             value: Value to cache
             ttl: Time-to-live in seconds (uses category default if not specified)
+            objects: For 'query_results', the objects the query reads. Defaults to
+                     the FROM objects of the key when it is a SOQL query.
         """
+        # Interned keys make later lookups compare by identity (custom key_funcs
+        # may return other hashables, e.g. tuples)
+        if type(key) is str:
+            key = sys.intern(key)
+
         with self._lock:
             cache = self._get_category_cache(category)
 
@@ -132,18 +204,74 @@ class GlobalCache:
             # Evict oldest if at capacity
             while len(cache) >= self.MAX_SIZE:
                 oldest_key = next(iter(cache))
-                del cache[oldest_key]
+                self._remove(category, cache, oldest_key)
                 self._stats['evictions'] += 1
                 logger.debug(f"Cache eviction: {category}/{oldest_key}")
 
             # Store entry
             cache[key] = CacheEntry(
                 value=value,
-                created_at=time.time(),
+                created_at=time.monotonic(),
                 ttl=ttl
             )
+
+            if category == 'query_results':
+                self._index_query(key, objects)
             logger.debug(f"Cache set: {category}/{key} (TTL: {ttl}s)")
 
+    def _index_query(self, key: str, objects: Optional[Iterable[str]]) -> None:
+        """Record which objects a cached query reads (caller holds the lock)"""
+        self._unindex_query(key)
+
+        if objects is None:
+            objects = _SOQL_FROM_RE.findall(key) if type(key) is str else ()
+            # Queries reaching other objects through relationship paths are
+            # also matched by substring
+            if objects and _SOQL_PATH_RE.search(key):
+                self._unindexed_queries.add(key)
+
+        object_names = tuple({object_name.casefold() for object_name in objects})
+        if not object_names:
+            # Keys from a custom key_func or without a FROM clause
+            self._unindexed_queries.add(key)
+            return
+
+        self._query_objects[key] = object_names
+        for object_name in object_names:
+            self._query_by_object.setdefault(object_name, set()).add(key)
+
+    def invalidate_object_queries(self, object_name: str) -> int:
+        """
+        Invalidate all cached query results that read an object.
+
+        Indexed keys are found through the object index; keys the index can't
+        fully describe (or every key, when the object has no index entry) are
+        matched by substring, as invalidate_pattern('*object*') would.
+
+        Args:
+            object_name: Object API name (case-insensitive)
+
+        Returns:
+            Number of entries invalidated
+        """
+        with self._lock:
+            cache = self._get_category_cache('query_results')
+            folded = object_name.casefold()
+            keys = self._query_by_object.get(folded)
+            if keys is None:
+                keys, candidates = set(), cache
+            else:
+                keys, candidates = set(keys), self._unindexed_queries
+            keys.update(k for k in candidates if folded in str(k).casefold())
+
+            count = 0
+            for key in keys:
+                if key in cache:
+                    self._remove('query_results', cache, key)
+                    count += 1
+            logger.debug(f"Cache invalidated: query_results for {object_name} ({count} entries)")
+            return count
+
     def delete(self, category: str, key: str) -> bool:
         """
         Delete specific entry from cache.
@@ -158,7 +286,7 @@ class GlobalCache:
         with self._lock:
             cache = self._get_category_cache(category)
             if key in cache:
-                del cache[key]
+                self._remove(category, cache, key)
                 logger.debug(f"Cache delete: {category}/{key}")
                 return True
             return False
@@ -176,7 +304,11 @@ class GlobalCache:
         with self._lock:
             if category in self._cache:
                 count = len(self._cache[category])
-                self._cache[category] = OrderedDict()
+                self._cache[category] = {}
+                if category == 'query_results':
+                    self._query_by_object = {}
+                    self._query_objects = {}
+                    self._unindexed_queries = set()
                 logger.info(f"Cache cleared: {category} ({count} entries)")
                 return count
             return 0
@@ -191,6 +323,9 @@ class GlobalCache:
         with self._lock:
             total = sum(len(c) for c in self._cache.values())
             self._cache = {}
+            self._query_by_object = {}
+            self._query_objects = {}
+            self._unindexed_queries = set()
             self._stats = {'hits': 0, 'misses': 0, 'evictions': 0}
             logger.info(f"Cache cleared: all ({total} entries)")
             return total
@@ -206,12 +341,16 @@ class GlobalCache:
         Returns:
             Number of entries invalidated
         """
-        import fnmatch
         with self._lock:
             cache = self._get_category_cache(category)
-            keys_to_delete = [k for k in cache.keys() if fnmatch.fnmatch(k, pattern)]
+            if not _GLOB_FLAGS and not _WILDCARD_CHARS.intersection(pattern):
+                # No wildcards - the pattern can only match itself
+                keys_to_delete = [pattern] if pattern in cache else []
+            else:
+                regex = re.compile(fnmatch.translate(pattern), _GLOB_FLAGS)
+                keys_to_delete = [k for k in cache if regex.match(k)]
             for key in keys_to_delete:
-                del cache[key]
+                self._remove(category, cache, key)
             logger.info(f"Cache invalidated: {category}/{pattern} ({len(keys_to_delete)} entries)")
             return len(keys_to_delete)
 
@@ -241,10 +380,11 @@ class GlobalCache:
         """
         with self._lock:
             removed = 0
+            now = time.monotonic()
             for category, cache in self._cache.items():
-                expired_keys = [k for k, v in cache.items() if v.is_expired()]
+                expired_keys = [k for k, v in cache.items() if v.is_expired(now)]
                 for key in expired_keys:
-                    del cache[key]
+                    self._remove(category, cache, key)
                     removed += 1
             if removed > 0:
                 logger.info(f"Cache cleanup: removed {removed} expired entries")
@@ -340,5 +480,5 @@ def invalidate_object_cache(object_name: str) -> None:
     cache.delete('object_metadata', object_name)
     cache.delete('field_definitions', object_name)
     cache.delete('validation_rules', object_name)
-    cache.invalidate_pattern('query_results', f"*{object_name}*")
+    cache.invalidate_object_queries(object_name)
     logger.info(f"Invalidated cache for object: {object_name}")
@@ -10,11 +10,11 @@ Provides:
 Created by Sameer
 """
 import time
+import heapq
 import threading
 import logging
-from typing import Optional, Dict, Any, Callable
+from typing import Optional, Dict, Any, Callable, Iterable, List, Set, Tuple
 from dataclasses import dataclass, field
-from collections import OrderedDict
 from contextlib import contextmanager
 from enum import Enum
 
@@ -29,9 +29,13 @@ class ConnectionState(Enum):
     FAILED = "failed"
 
 
-@dataclass
+# States counted as active in pool statistics (enum members compare by identity)
+_ACTIVE_STATES = frozenset({ConnectionState.AVAILABLE, ConnectionState.IN_USE})
+
+
+@dataclass(slots=True)
 class ConnectionInfo:
-    """Metadata about a pooled connection"""
+    """Metadata about a pooled connection (times are time.monotonic() values)"""
     connection: Any  # Salesforce connection object
     user_id: str
     instance_url: str
@@ -41,18 +45,23 @@ class ConnectionInfo:
     use_count: int = 0
     error_count: int = 0
     last_error: Optional[str] = None
+    stale_after: float = float("inf")  # created_at + the pool's max_age
 
-    def is_stale(self, max_age: float = 3600) -> bool:
+    def is_stale(self, max_age: float = 3600, now: Optional[float] = None) -> bool:
         """Check if connection is stale (default 1 hour)"""
-        return time.time() - self.created_at > max_age
+        if now is None:
+            now = time.monotonic()
+        return now - self.created_at > max_age
 
-    def is_idle(self, max_idle: float = 300) -> bool:
+    def is_idle(self, max_idle: float = 300, now: Optional[float] = None) -> bool:
         """Check if connection has been idle too long (default 5 minutes)"""
-        return time.time() - self.last_used > max_idle
+        if now is None:
+            now = time.monotonic()
+        return now - self.last_used > max_idle
 
     def touch(self):
         """Update last used time"""
-        self.last_used = time.time()
+        self.last_used = time.monotonic()
         self.use_count += 1
 
     def mark_error(self, error_msg: str):
@@ -63,6 +72,75 @@ class ConnectionInfo:
             self.state = ConnectionState.FAILED
 
 
+class _Shard:
+    """One independently locked slice of the pool, with its own counters.
+
+    Counters are plain ints so get_stats() can read them without the lock
+    (int attribute reads are atomic under the GIL).
+
+    Cleanup candidates are indexed so cleanup never scans every connection:
+    idle_heap holds (last_used, user_id) for connections released as
+    available - entries go stale when the connection is used again and are
+    skipped lazily - and failed holds user_ids marked failed.
+    """
+    __slots__ = (
+        "connections", "lock", "idle_heap", "failed",
+        "total_requests", "cache_hits", "cache_misses", "reconnections", "errors"
+    )
+
+    def __init__(self):
+        # Plain dict - insertion order is enough to evict the oldest connection
+        self.connections: Dict[str, ConnectionInfo] = {}
+        # Plain Lock - no method re-enters it, so RLock's owner tracking is wasted
+        self.lock = threading.Lock()
+        self.idle_heap: List[Tuple[float, str]] = []
+        self.failed: Set[str] = set()
+        self.reset_stats()
+
+    def track_available(self, user_id: str, conn_info: ConnectionInfo):
+        """Queue an available connection for idle cleanup (caller holds the lock)"""
+        heapq.heappush(self.idle_heap, (conn_info.last_used, user_id))
+        # Rebuild from live entries once stale ones dominate
+        if len(self.idle_heap) > 2 * len(self.connections) + 16:
+            self.idle_heap = [
+                (info.last_used, uid) for uid, info in self.connections.items()
+                if info.state is ConnectionState.AVAILABLE
+            ]
+            heapq.heapify(self.idle_heap)
+
+    def remove_many(self, user_ids: List[str]):
+        """Remove connections in bulk (caller holds the lock).
+
+        Removing most of the shard rebuilds the dict in one pass instead of
+        deleting key by key.
+        """
+        if len(user_ids) > len(self.connections) // 2:
+            doomed = set(user_ids)
+            self.connections = {
+                uid: info for uid, info in self.connections.items() if uid not in doomed
+            }
+        else:
+            for user_id in user_ids:
+                del self.connections[user_id]
+
+    def reset_stats(self):
+        """Zero the usage counters"""
+        self.total_requests = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.reconnections = 0
+        self.errors = 0
+
+
+def _needs_health_check(conn_info: ConnectionInfo, now: float, threshold: float = 30.0) -> bool:
+    """Check if a borrowed connection has been quiet long enough to need a liveness test.
+
+    Recent use already proved the connection works, so the check round-trip
+    is skipped for anything used within the threshold.
+    """
+    return (now - conn_info.last_used) > threshold
+
+
 class ConnectionPool:
     """
     Thread-safe connection pool for Salesforce connections.
@@ -72,6 +150,13 @@ class ConnectionPool:
     - Automatic reconnection
     - Connection health checking
     - Usage statistics
+
+    Connections are spread over independently locked shards keyed by
+    user_id, so requests for different orgs rarely wait on each other.
+    max_connections caps the whole pool: a pool-wide insertion order (under
+    its own lock, only touched when connections are added or removed) picks
+    the oldest connection to evict, whichever shard it lives in. Lock order
+    is shard lock, then order lock - never the other way round.
     """
 
     # Default configuration
@@ -79,110 +164,198 @@ class ConnectionPool:
     MAX_AGE = 3600  # 1 hour
     MAX_IDLE = 300  # 5 minutes
     HEALTH_CHECK_INTERVAL = 60  # 1 minute
+    BORROW_CHECK_THRESHOLD = 30  # Only test connections idle longer than this
+    SHARDS = 16  # Rounded up to a power of two
 
     def __init__(
         self,
         max_connections: int = MAX_CONNECTIONS,
         max_age: float = MAX_AGE,
-        max_idle: float = MAX_IDLE
+        max_idle: float = MAX_IDLE,
+        shards: int = SHARDS,
+        test_on_borrow: Optional[Callable[[Any], bool]] = None,
+        borrow_check_threshold: float = BORROW_CHECK_THRESHOLD
     ):
-        self._connections: OrderedDict[str, ConnectionInfo] = OrderedDict()
-        self._lock = threading.RLock()
-        self._stats = {
-            "total_requests": 0,
-            "cache_hits": 0,
-            "cache_misses": 0,
-            "reconnections": 0,
-            "errors": 0
-        }
+        shard_count = 1 << max(shards - 1, 0).bit_length()
+        self._shards = [_Shard() for _ in range(shard_count)]
+        self._shard_mask = shard_count - 1
+        # Every pooled connection in insertion order, for pool-wide eviction
+        self._order: Dict[str, ConnectionInfo] = {}
+        self._order_lock = threading.Lock()
         self.max_connections = max_connections
         self.max_age = max_age
         self.max_idle = max_idle
+        # Optional liveness test run on pool hits (see _needs_health_check)
+        self.test_on_borrow = test_on_borrow
+        self.borrow_check_threshold = borrow_check_threshold
+
+    @property
+    def max_age(self) -> float:
+        """Maximum connection age in seconds"""
+        return self._max_age
+
+    @max_age.setter
+    def max_age(self, max_age: float):
+        # Pooled connections keep their deadline in stale_after - move it too
+        self._max_age = max_age
+        for shard in self._shards:
+            with shard.lock:
+                for conn_info in shard.connections.values():
+                    conn_info.stale_after = conn_info.created_at + max_age
+
+    def _shard_for(self, user_id: str) -> _Shard:
+        """Get the shard that owns a user_id"""
+        return self._shards[hash(user_id) & self._shard_mask]
 
     def get_connection(
         self,
         user_id: str,
-        connection_factory: Optional[Callable[[], Any]] = None
+        connection_factory: Optional[Callable[[], Any]] = None,
+        check_on_borrow: Optional[bool] = None
     ) -> Optional[Any]:
         """
         Get a connection from the pool.
 
         Args:
             user_id: Unique identifier for the org/user
-            connection_factory: Optional factory to create new connection
+            connection_factory: Optional factory to create new connection.
+                               Called with the shard lock held, so it must not
+                               call back into the pool.
+            check_on_borrow: Run the pool's test_on_borrow on a pool hit that
+                            has been idle past borrow_check_threshold.
+                            None uses it whenever the pool has one; False
+                            skips it for this call.
 
         Returns:
             Salesforce connection object or None
         """
-        with self._lock:
-            self._stats["total_requests"] += 1
+        now = time.monotonic()
+        shard = self._shard_for(user_id)
+        victims = None
+        with shard.lock:
+            shard.total_requests += 1
 
             # Check if we have an existing connection
-            if user_id in self._connections:
-                conn_info = self._connections[user_id]
-
+            conn_info = shard.connections.get(user_id)
+            if conn_info is not None:
                 # Check if connection is usable
-                if self._is_connection_usable(conn_info):
+                if self._is_connection_usable(conn_info, now) and self._passes_borrow_check(
+                    conn_info, now, check_on_borrow
+                ):
                     conn_info.touch()
                     conn_info.state = ConnectionState.IN_USE
-                    self._stats["cache_hits"] += 1
+                    shard.cache_hits += 1
                     logger.debug(f"Pool hit for {user_id}")
                     return conn_info.connection
 
                 # Connection not usable, remove it
                 logger.info(f"Removing stale/failed connection for {user_id}")
-                del self._connections[user_id]
+                del shard.connections[user_id]
+                self._forget(((user_id, conn_info),))
 
-            self._stats["cache_misses"] += 1
+            shard.cache_misses += 1
 
             # Create new connection if factory provided
+            connection = None
             if connection_factory:
                 try:
                     connection = connection_factory()
                     if connection:
-                        self._add_connection(user_id, connection)
-                        return connection
+                        victims = self._add_connection_locked(shard, user_id, connection)
                 except Exception as e:
                     logger.error(f"Failed to create connection: {e}")
-                    self._stats["errors"] += 1
+                    shard.errors += 1
+                    connection = None
 
-            return None
+        # Evict outside the shard lock - victims may live in other shards
+        if victims:
+            self._evict(victims)
+        return connection or None
 
-    def _is_connection_usable(self, conn_info: ConnectionInfo) -> bool:
+    def _is_connection_usable(self, conn_info: ConnectionInfo, now: float) -> bool:
         """Check if a connection is usable"""
-        if conn_info.state == ConnectionState.FAILED:
+        if conn_info.state is ConnectionState.FAILED:
             return False
-        if conn_info.is_stale(self.max_age):
+        if now > conn_info.stale_after:
             conn_info.state = ConnectionState.STALE
             return False
         return True
 
-    def _add_connection(
+    def _passes_borrow_check(
         self,
+        conn_info: ConnectionInfo,
+        now: float,
+        check_on_borrow: Optional[bool]
+    ) -> bool:
+        """Test a borrowed connection's liveness when it has been idle a while"""
+        check_func = self.test_on_borrow
+        if check_func is None or check_on_borrow is False:
+            return True
+        if not _needs_health_check(conn_info, now, self.borrow_check_threshold):
+            return True
+        try:
+            if check_func(conn_info.connection):
+                return True
+        except Exception as e:
+            logger.warning(f"Borrow check failed for {conn_info.user_id}: {e}")
+        conn_info.state = ConnectionState.FAILED
+        return False
+
+    def _add_connection_locked(
+        self,
+        shard: _Shard,
         user_id: str,
         connection: Any,
         instance_url: str = ""
-    ) -> ConnectionInfo:
-        """Add a new connection to the pool"""
-        with self._lock:
-            # Evict oldest if at capacity
-            while len(self._connections) >= self.max_connections:
-                oldest_key = next(iter(self._connections))
-                logger.info(f"Evicting connection for {oldest_key}")
-                del self._connections[oldest_key]
-
-            now = time.time()
-            conn_info = ConnectionInfo(
-                connection=connection,
-                user_id=user_id,
-                instance_url=instance_url,
-                created_at=now,
-                last_used=now,
-                state=ConnectionState.IN_USE
-            )
-            self._connections[user_id] = conn_info
-            logger.info(f"Added new connection for {user_id}")
-            return conn_info
+    ) -> List[Tuple[str, ConnectionInfo]]:
+        """Add a new connection to a shard (caller must hold shard.lock).
+
+        Returns:
+            The oldest connections pushed out by the pool-wide cap. The caller
+            must pass them to _evict() after releasing shard.lock.
+        """
+        now = time.monotonic()
+        conn_info = ConnectionInfo(
+            connection=connection,
+            user_id=user_id,
+            instance_url=instance_url,
+            created_at=now,
+            last_used=now,
+            state=ConnectionState.IN_USE,
+            stale_after=now + self.max_age
+        )
+        # Evict oldest if at capacity
+        victims = []
+        with self._order_lock:
+            order = self._order
+            while order and len(order) >= self.max_connections:
+                oldest_key = next(iter(order))
+                victims.append((oldest_key, order.pop(oldest_key)))
+            order[user_id] = conn_info
+
+        shard.connections[user_id] = conn_info
+        logger.info(f"Added new connection for {user_id}")
+        return victims
+
+    def _evict(self, victims: List[Tuple[str, ConnectionInfo]]):
+        """Remove connections dropped from the pool-wide order (no lock held).
+
+        A victim that was removed or replaced in the meantime is left alone.
+        """
+        for user_id, conn_info in victims:
+            shard = self._shard_for(user_id)
+            with shard.lock:
+                if shard.connections.get(user_id) is conn_info:
+                    logger.info(f"Evicting connection for {user_id}")
+                    del shard.connections[user_id]
+
+    def _forget(self, removed: Iterable[Tuple[str, ConnectionInfo]]):
+        """Drop removed connections from the pool-wide order (caller holds their shard lock)"""
+        with self._order_lock:
+            order = self._order
+            for user_id, conn_info in removed:
+                if order.get(user_id) is conn_info:
+                    del order[user_id]
 
     def release_connection(self, user_id: str, success: bool = True, error: Optional[str] = None):
         """
@@ -193,14 +366,17 @@ class ConnectionPool:
             success: Whether the operation was successful
             error: Optional error message
         """
-        with self._lock:
-            if user_id in self._connections:
-                conn_info = self._connections[user_id]
+        shard = self._shard_for(user_id)
+        with shard.lock:
+            conn_info = shard.connections.get(user_id)
+            if conn_info is not None:
                 if success:
                     conn_info.state = ConnectionState.AVAILABLE
+                    shard.track_available(user_id, conn_info)
                 else:
                     conn_info.mark_error(error or "Unknown error")
-                    if conn_info.state == ConnectionState.FAILED:
+                    if conn_info.state is ConnectionState.FAILED:
+                        shard.failed.add(user_id)
                         logger.warning(f"Connection marked failed for {user_id}")
 
     def remove_connection(self, user_id: str) -> bool:
@@ -213,9 +389,11 @@ class ConnectionPool:
         Returns:
             True if connection was removed
         """
-        with self._lock:
-            if user_id in self._connections:
-                del self._connections[user_id]
+        shard = self._shard_for(user_id)
+        with shard.lock:
+            conn_info = shard.connections.pop(user_id, None)
+            if conn_info is not None:
+                self._forget(((user_id, conn_info),))
                 logger.info(f"Removed connection for {user_id}")
                 return True
             return False
@@ -234,27 +412,34 @@ class ConnectionPool:
             connection: New Salesforce connection
             instance_url: Instance URL
         """
-        with self._lock:
-            if user_id in self._connections:
+        shard = self._shard_for(user_id)
+        victims = None
+        with shard.lock:
+            conn_info = shard.connections.get(user_id)
+            if conn_info is not None:
                 # Update existing
-                conn_info = self._connections[user_id]
                 conn_info.connection = connection
                 conn_info.instance_url = instance_url
                 conn_info.state = ConnectionState.AVAILABLE
                 conn_info.error_count = 0
                 conn_info.last_error = None
                 conn_info.touch()
-                self._stats["reconnections"] += 1
+                shard.track_available(user_id, conn_info)
+                shard.reconnections += 1
                 logger.info(f"Updated connection for {user_id}")
             else:
                 # Add new
-                self._add_connection(user_id, connection, instance_url)
+                victims = self._add_connection_locked(shard, user_id, connection, instance_url)
+
+        if victims:
+            self._evict(victims)
 
     @contextmanager
     def connection(
         self,
         user_id: str,
-        connection_factory: Optional[Callable[[], Any]] = None
+        connection_factory: Optional[Callable[[], Any]] = None,
+        check_on_borrow: Optional[bool] = None
     ):
         """
         Context manager for using a pooled connection.
@@ -262,6 +447,8 @@ class ConnectionPool:
         Args:
             user_id: Connection identifier
             connection_factory: Optional factory to create new connection
+            check_on_borrow: Override the pool's test_on_borrow for this call
+                            (None = pool default, False = skip)
 
         Yields:
             Salesforce connection object
@@ -270,7 +457,7 @@ class ConnectionPool:
             with pool.connection("user123") as sf:
                 result = sf.query("SELECT Id FROM Account")
         """
-        conn = self.get_connection(user_id, connection_factory)
+        conn = self.get_connection(user_id, connection_factory, check_on_borrow)
         try:
             yield conn
             self.release_connection(user_id, success=True)
@@ -285,18 +472,31 @@ class ConnectionPool:
         Returns:
             Number of connections removed
         """
-        with self._lock:
-            removed = 0
-            idle_users = [
-                user_id for user_id, conn_info in self._connections.items()
-                if conn_info.is_idle(self.max_idle) and conn_info.state == ConnectionState.AVAILABLE
-            ]
-            for user_id in idle_users:
-                del self._connections[user_id]
-                removed += 1
-            if removed > 0:
-                logger.info(f"Cleaned up {removed} idle connections")
-            return removed
+        removed = 0
+        now = time.monotonic()
+        cutoff = now - self.max_idle
+        for shard in self._shards:
+            with shard.lock:
+                heap = shard.idle_heap
+                connections = shard.connections
+                # Oldest release first; stop at the first entry that is not idle yet.
+                # Deleting as we pop keeps this one pass: a duplicate entry from a
+                # connection released twice without use finds it already gone.
+                while heap and heap[0][0] < cutoff:
+                    last_used, user_id = heapq.heappop(heap)
+                    conn_info = connections.get(user_id)
+                    if (
+                        conn_info is not None
+                        and conn_info.last_used == last_used
+                        and conn_info.state is ConnectionState.AVAILABLE
+                        and conn_info.is_idle(self.max_idle, now)
+                    ):
+                        del connections[user_id]
+                        self._forget(((user_id, conn_info),))
+                        removed += 1
+        if removed > 0:
+            logger.info(f"Cleaned up {removed} idle connections")
+        return removed
 
     def cleanup_failed_connections(self) -> int:
         """
@@ -305,18 +505,23 @@ class ConnectionPool:
         Returns:
             Number of connections removed
         """
-        with self._lock:
-            removed = 0
-            failed_users = [
-                user_id for user_id, conn_info in self._connections.items()
-                if conn_info.state == ConnectionState.FAILED
-            ]
-            for user_id in failed_users:
-                del self._connections[user_id]
-                removed += 1
-            if removed > 0:
-                logger.info(f"Cleaned up {removed} failed connections")
-            return removed
+        removed = 0
+        for shard in self._shards:
+            with shard.lock:
+                # Skip entries that were since removed or reconnected
+                failed = [
+                    (user_id, conn_info) for user_id in shard.failed
+                    if (conn_info := shard.connections.get(user_id)) is not None
+                    and conn_info.state is ConnectionState.FAILED
+                ]
+                failed_users = [user_id for user_id, _ in failed]
+                shard.remove_many(failed_users)
+                self._forget(failed)
+                shard.failed.clear()
+                removed += len(failed_users)
+        if removed > 0:
+            logger.info(f"Cleaned up {removed} failed connections")
+        return removed
 
     def clear(self) -> int:
         """
@@ -325,57 +530,85 @@ class ConnectionPool:
         Returns:
             Number of connections cleared
         """
-        with self._lock:
-            count = len(self._connections)
-            self._connections.clear()
-            self._stats = {
-                "total_requests": 0,
-                "cache_hits": 0,
-                "cache_misses": 0,
-                "reconnections": 0,
-                "errors": 0
-            }
-            logger.info(f"Cleared {count} connections from pool")
-            return count
+        count = 0
+        for shard in self._shards:
+            with shard.lock:
+                count += len(shard.connections)
+                shard.connections.clear()
+                shard.idle_heap.clear()
+                shard.failed.clear()
+                shard.reset_stats()
+                # Inside the shard lock so a concurrent add to this shard is not lost
+                with self._order_lock:
+                    self._order = {
+                        uid: info for uid, info in self._order.items()
+                        if self._shard_for(uid) is not shard
+                    }
+        logger.info(f"Cleared {count} connections from pool")
+        return count
 
-    def get_stats(self) -> Dict[str, Any]:
-        """Get pool statistics"""
-        with self._lock:
-            active = sum(
-                1 for c in self._connections.values()
-                if c.state in [ConnectionState.AVAILABLE, ConnectionState.IN_USE]
-            )
-            hit_rate = (
-                self._stats["cache_hits"] / self._stats["total_requests"] * 100
-                if self._stats["total_requests"] > 0 else 0
-            )
-            return {
-                "total_connections": len(self._connections),
-                "active_connections": active,
-                "total_requests": self._stats["total_requests"],
-                "cache_hits": self._stats["cache_hits"],
-                "cache_misses": self._stats["cache_misses"],
-                "hit_rate_percent": round(hit_rate, 2),
-                "reconnections": self._stats["reconnections"],
-                "errors": self._stats["errors"],
-                "connections": [
-                    {
+    def get_summary_stats(self) -> Dict[str, Any]:
+        """Get pool counters without per-connection details.
+
+        Lock-free - counters and dict sizes are single reads under the GIL -
+        so metrics scrapes never wait on get_connection.
+        """
+        shards = self._shards
+        total_requests = sum(shard.total_requests for shard in shards)
+        cache_hits = sum(shard.cache_hits for shard in shards)
+        # Basis points via integer math (rounded half up) - no float divide + round()
+        hit_rate_bp = 0
+        if total_requests > 0:
+            hit_rate_bp = (cache_hits * 20000 + total_requests) // (2 * total_requests)
+        return {
+            "total_connections": sum(len(shard.connections) for shard in shards),
+            "total_requests": total_requests,
+            "cache_hits": cache_hits,
+            "cache_misses": sum(shard.cache_misses for shard in shards),
+            "hit_rate_percent": hit_rate_bp / 100,
+            "reconnections": sum(shard.reconnections for shard in shards),
+            "errors": sum(shard.errors for shard in shards)
+        }
+
+    def get_detailed_stats(self) -> Dict[str, Any]:
+        """Get pool counters plus a snapshot of every connection"""
+        stats = self.get_summary_stats()
+
+        connections = []
+        active = 0
+        now = time.monotonic()
+        for shard in self._shards:
+            with shard.lock:
+                for user_id, conn_info in shard.connections.items():
+                    connections.append({
                         "user_id": user_id,
                         "state": conn_info.state.value,
                         "use_count": conn_info.use_count,
-                        "age_seconds": round(time.time() - conn_info.created_at, 1),
-                        "idle_seconds": round(time.time() - conn_info.last_used, 1)
-                    }
-                    for user_id, conn_info in self._connections.items()
-                ]
-            }
+                        "age_seconds": round(now - conn_info.created_at, 1),
+                        "idle_seconds": round(now - conn_info.last_used, 1)
+                    })
+                    if conn_info.state in _ACTIVE_STATES:
+                        active += 1
+
+        return {
+            "total_connections": len(connections),
+            "active_connections": active,
+            **{key: value for key, value in stats.items() if key != "total_connections"},
+            "connections": connections
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool statistics (same as get_detailed_stats)"""
+        return self.get_detailed_stats()
 
     def health_check(self, check_func: Optional[Callable[[Any], bool]] = None) -> Dict[str, Any]:
         """
         Perform health check on all connections.
 
         Args:
-            check_func: Optional function to test connection health
+            check_func: Optional function to test connection health. Called
+                       with a shard lock held, so it must not call back
+                       into the pool.
 
         Returns:
             Health check results
@@ -386,38 +619,40 @@ class ConnectionPool:
             "details": []
         }
 
-        with self._lock:
-            for user_id, conn_info in list(self._connections.items()):
-                is_healthy = True
-                status = "healthy"
-
-                # Check state
-                if conn_info.state == ConnectionState.FAILED:
-                    is_healthy = False
-                    status = "failed"
-                elif conn_info.is_stale(self.max_age):
-                    is_healthy = False
-                    status = "stale"
-                elif check_func:
-                    try:
-                        if not check_func(conn_info.connection):
-                            is_healthy = False
-                            status = "check_failed"
-                    except Exception as e:
+        now = time.monotonic()
+        for shard in self._shards:
+            with shard.lock:
+                for user_id, conn_info in list(shard.connections.items()):
+                    is_healthy = True
+                    status = "healthy"
+
+                    # Check state
+                    if conn_info.state is ConnectionState.FAILED:
                         is_healthy = False
-                        status = f"error: {str(e)}"
+                        status = "failed"
+                    elif now > conn_info.stale_after:
+                        is_healthy = False
+                        status = "stale"
+                    elif check_func:
+                        try:
+                            if not check_func(conn_info.connection):
+                                is_healthy = False
+                                status = "check_failed"
+                        except Exception as e:
+                            is_healthy = False
+                            status = f"error: {str(e)}"
 
-                if is_healthy:
-                    results["healthy"] += 1
-                else:
-                    results["unhealthy"] += 1
+                    if is_healthy:
+                        results["healthy"] += 1
+                    else:
+                        results["unhealthy"] += 1
 
-                results["details"].append({
-                    "user_id": user_id,
-                    "status": status,
-                    "error_count": conn_info.error_count,
-                    "last_error": conn_info.last_error
-                })
+                    results["details"].append({
+                        "user_id": user_id,
+                        "status": status,
+                        "error_count": conn_info.error_count,
+                        "last_error": conn_info.last_error
+                    })
 
         return results
 
@@ -433,11 +668,14 @@ _pool_lock = threading.Lock()
 def get_connection_pool() -> ConnectionPool:
     """Get the global connection pool instance (lazy initialization)"""
     global _global_pool
-    if _global_pool is None:
-        with _pool_lock:
-            if _global_pool is None:
-                _global_pool = ConnectionPool()
-    return _global_pool
+    # Fast path: one global read, no lock once the pool exists
+    pool = _global_pool
+    if pool is not None:
+        return pool
+    with _pool_lock:
+        if _global_pool is None:
+            _global_pool = ConnectionPool()
+        return _global_pool
 
 
 def reset_connection_pool():
@@ -481,6 +719,11 @@ def get_pool_stats() -> Dict[str, Any]:
     return get_connection_pool().get_stats()
 
 
+def get_pool_summary_stats() -> Dict[str, Any]:
+    """Get global pool counters without per-connection details (lock-free)"""
+    return get_connection_pool().get_summary_stats()
+
+
 def cleanup_pool():
     """Cleanup idle and failed connections"""
     pool = get_connection_pool()
@@ -9,15 +9,35 @@ Provides:
 Created by Sameer
 """
 import re
+import sys
 import json
 import logging
-from typing import Optional, Dict, Any, List, Tuple
-from dataclasses import dataclass, field, asdict
+from collections import Counter
+from types import MappingProxyType
+from typing import Optional, Dict, Any, List, Mapping, Tuple
+from dataclasses import dataclass, asdict
 from enum import Enum
 
+# Optional: orjson serializes several times faster than the stdlib json module
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
 
+def _dumps(obj: Any) -> str:
+    """Serialize an error response compactly (orjson when installed)"""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+        except TypeError:
+            pass  # e.g. ints beyond 64 bits - let stdlib json handle or report it
+    return json.dumps(obj, separators=(",", ":"))
+
+
 class ErrorCategory(Enum):
     """Categories of Salesforce errors for better handling"""
     AUTHENTICATION = "authentication"
@@ -33,13 +53,13 @@ class ErrorCategory(Enum):
     UNKNOWN = "unknown"
 
 
-@dataclass
+@dataclass(slots=True)
 class SalesforceError:
     """Structured Salesforce error with suggestions"""
     error_code: str
     message: str
     category: ErrorCategory
-    suggestions: List[str] = field(default_factory=list)
+    suggestions: Tuple[str, ...] = ()
     documentation_link: Optional[str] = None
     original_error: Optional[str] = None
     field_name: Optional[str] = None
@@ -60,6 +80,8 @@ class SalesforceError:
 
     def to_json(self) -> str:
         """Convert to JSON string"""
+        if ORJSON_AVAILABLE:
+            return orjson.dumps(self.to_dict(), option=orjson.OPT_INDENT_2).decode()
         return json.dumps(self.to_dict(), indent=2)
 
 
@@ -67,257 +89,287 @@ class SalesforceError:
 # SALESFORCE ERROR PATTERNS AND SUGGESTIONS
 # =============================================================================
 
-SALESFORCE_ERROR_PATTERNS: Dict[str, Dict[str, Any]] = {
+_ERROR_PATTERNS: Dict[str, Dict[str, Any]] = {
     # Authentication Errors
     "INVALID_SESSION_ID": {
         "category": ErrorCategory.AUTHENTICATION,
         "message": "Your Salesforce session has expired or is invalid.",
-        "suggestions": [
+        "suggestions": (
             "Re-authenticate using salesforce_sandbox_login or salesforce_production_login",
             "Check if your access token has expired",
             "Verify your connected app settings in Salesforce Setup",
             "Ensure IP restrictions are not blocking your connection"
-        ],
+        ),
         "doc_link": "https://help.salesforce.com/s/articleView?id=sf.connected_app_overview.htm"
     },
     "INVALID_LOGIN": {
         "category": ErrorCategory.AUTHENTICATION,
         "message": "Login credentials are invalid.",
-        "suggestions": [
+        "suggestions": (
             "Verify your username and password are correct",
             "Check if your account is locked or requires password reset",
             "Ensure you're using the correct login URL (test.salesforce.com for sandbox)",
             "Verify security token is appended to password if required"
-        ]
+        )
     },
     "INVALID_GRANT": {
         "category": ErrorCategory.AUTHENTICATION,
         "message": "OAuth grant is invalid or expired.",
-        "suggestions": [
+        "suggestions": (
             "Re-authenticate using the login tools",
             "Check if refresh token has been revoked",
             "Verify Connected App permissions in Salesforce",
             "Clear stored tokens using salesforce_logout and re-login"
-        ]
+        )
     },
 
     # Authorization/Permission Errors
     "INSUFFICIENT_ACCESS": {
         "category": ErrorCategory.AUTHORIZATION,
         "message": "You don't have permission to access this resource.",
-        "suggestions": [
+        "suggestions": (
             "Check user profile permissions for the object",
             "Verify field-level security settings",
             "Ensure user has appropriate permission sets assigned",
             "Check sharing rules and record ownership",
             "Use list_user_permissions to see current user access"
-        ]
+        )
     },
     "INSUFFICIENT_ACCESS_OR_READONLY": {
         "category": ErrorCategory.AUTHORIZATION,
         "message": "Insufficient access rights or the record is read-only.",
-        "suggestions": [
+        "suggestions": (
             "Check if user has Edit permission on the object",
             "Verify the record is not locked by an approval process",
             "Check for validation rules preventing the edit",
             "Ensure the record type allows modifications"
-        ]
+        )
     },
     "FIELD_CUSTOM_VALIDATION_EXCEPTION": {
         "category": ErrorCategory.VALIDATION,
         "message": "A validation rule is preventing this operation.",
-        "suggestions": [
+        "suggestions": (
             "Use diagnose_and_fix_issue with issue_type='validation' to identify the rule",
             "Check active validation rules on the object",
             "Review the error message for specific field requirements",
             "Ensure all required fields have valid values"
-        ]
+        )
     },
     "CANNOT_INSERT_UPDATE_ACTIVATE_ENTITY": {
         "category": ErrorCategory.VALIDATION,
         "message": "A trigger or process is preventing this operation.",
-        "suggestions": [
+        "suggestions": (
             "Check for triggers on the object that may be failing",
             "Review Process Builder or Flow automations",
             "Look for recursion issues in triggers",
             "Use diagnose_and_fix_issue with issue_type='trigger' for analysis"
-        ]
+        )
     },
 
     # Data Integrity Errors
     "REQUIRED_FIELD_MISSING": {
         "category": ErrorCategory.DATA_INTEGRITY,
         "message": "A required field is missing.",
-        "suggestions": [
+        "suggestions": (
             "Use fetch_object_metadata to see all required fields",
             "Check page layout for required field indicators",
             "Ensure all fields marked as required have values",
             "Review field-level security to ensure fields are visible"
-        ]
+        )
     },
     "DUPLICATE_VALUE": {
         "category": ErrorCategory.DATA_INTEGRITY,
         "message": "A duplicate value was found for a unique field.",
-        "suggestions": [
+        "suggestions": (
             "Query existing records to find the duplicate",
             "Check for duplicate rules on the object",
             "Verify the unique field value is actually unique",
             "Consider using upsert with an external ID instead"
-        ]
+        )
     },
     "DELETE_FAILED": {
         "category": ErrorCategory.DATA_INTEGRITY,
         "message": "Cannot delete this record.",
-        "suggestions": [
+        "suggestions": (
             "Check for child records that reference this record",
             "Verify the record is not referenced by lookup relationships",
             "Ensure no workflows or processes depend on this record",
             "Check if deletion is blocked by triggers or validation rules"
-        ]
+        )
     },
     "ENTITY_IS_DELETED": {
         "category": ErrorCategory.DATA_INTEGRITY,
         "message": "The record has been deleted.",
-        "suggestions": [
+        "suggestions": (
             "Check if the record is in the Recycle Bin",
             "Query the record with ALL ROWS to find deleted records",
             "Undelete the record if needed using the Salesforce UI",
             "Verify you're using the correct record ID"
-        ]
+        )
     },
 
     # API Limit Errors
     "REQUEST_LIMIT_EXCEEDED": {
         "category": ErrorCategory.API_LIMIT,
         "message": "API request limit has been exceeded.",
-        "suggestions": [
+        "suggestions": (
             "Use get_org_limits to check current API usage",
             "Implement bulk operations instead of individual calls",
             "Add caching to reduce redundant API calls",
             "Consider upgrading org edition for higher limits",
             "Wait for the limit to reset (usually 24 hours)"
-        ]
+        )
     },
     "QUERY_TIMEOUT": {
         "category": ErrorCategory.API_LIMIT,
         "message": "The query took too long to execute.",
-        "suggestions": [
+        "suggestions": (
             "Add selective filters to reduce result set",
             "Create custom indexes on frequently queried fields",
             "Use LIMIT clause to reduce returned records",
             "Break complex queries into smaller parts",
             "Avoid querying non-selective fields"
-        ]
+        )
     },
     "TOO_MANY_SOQL_QUERIES": {
         "category": ErrorCategory.API_LIMIT,
         "message": "Too many SOQL queries in a single transaction.",
-        "suggestions": [
+        "suggestions": (
             "Combine multiple queries into one using subqueries",
             "Use batch processing for large operations",
             "Review triggers for inefficient query patterns",
             "Cache query results when possible"
-        ]
+        )
     },
 
     # Not Found Errors
     "NOT_FOUND": {
         "category": ErrorCategory.NOT_FOUND,
         "message": "The requested resource was not found.",
-        "suggestions": [
+        "suggestions": (
             "Verify the record ID or API name is correct",
             "Check if the object/field exists in the org",
             "Use list_all_objects or list_metadata to find available resources",
             "Ensure you have visibility to the resource"
-        ]
+        )
     },
     "INVALID_FIELD": {
         "category": ErrorCategory.NOT_FOUND,
         "message": "One or more field names are invalid.",
-        "suggestions": [
+        "suggestions": (
             "Use fetch_object_metadata to see valid field names",
             "Check field API names (not labels) - usually ends with __c for custom",
             "Verify field-level security allows access to the field",
             "Ensure custom field deployment is complete"
-        ]
+        )
     },
     "INVALID_TYPE": {
         "category": ErrorCategory.NOT_FOUND,
         "message": "The object type is invalid or doesn't exist.",
-        "suggestions": [
+        "suggestions": (
             "Use list_all_objects to see available objects",
             "Check the object API name (not label)",
             "Verify custom object deployment is complete",
             "Ensure object is enabled for your user profile"
-        ]
+        )
     },
 
     # SOQL Syntax Errors
     "MALFORMED_QUERY": {
         "category": ErrorCategory.SYNTAX,
         "message": "The SOQL query has a syntax error.",
-        "suggestions": [
+        "suggestions": (
             "Check for missing or misplaced keywords (SELECT, FROM, WHERE)",
             "Verify all field names are valid",
             "Ensure string values are properly quoted with single quotes",
             "Use soql_query tool with explain=True for query analysis",
             "Check parentheses are balanced in complex conditions"
-        ]
+        )
     },
     "INVALID_QUERY_FILTER_OPERATOR": {
         "category": ErrorCategory.SYNTAX,
         "message": "Invalid operator used in query filter.",
-        "suggestions": [
+        "suggestions": (
             "Valid operators: =, !=, <, >, <=, >=, LIKE, IN, NOT IN",
             "Use LIKE with % wildcard for partial matching",
             "Use IN for multiple value matching",
             "Ensure operator is appropriate for field type"
-        ]
+        )
     },
 
     # Configuration Errors
     "UNABLE_TO_LOCK_ROW": {
         "category": ErrorCategory.CONFIGURATION,
         "message": "Unable to obtain exclusive access to this record.",
-        "suggestions": [
+        "suggestions": (
             "Another transaction is currently modifying this record",
             "Retry the operation after a brief delay",
             "Check for long-running batch jobs that may lock records",
             "Review triggers that might cause lock contention"
-        ]
+        )
     },
     "STORAGE_LIMIT_EXCEEDED": {
         "category": ErrorCategory.CONFIGURATION,
         "message": "Organization storage limit has been exceeded.",
-        "suggestions": [
+        "suggestions": (
             "Delete unnecessary records from the org",
             "Archive old data to external storage",
             "Check Recycle Bin for records to permanently delete",
             "Contact Salesforce to increase storage limits"
-        ]
+        )
     },
 
     # Network Errors
     "CONNECTION_RESET": {
         "category": ErrorCategory.NETWORK,
         "message": "Connection to Salesforce was reset.",
-        "suggestions": [
+        "suggestions": (
             "Check your internet connection",
             "Retry the request after a moment",
             "Verify Salesforce services are operational at status.salesforce.com",
             "Check if corporate firewall is blocking connections"
-        ]
+        )
     },
     "TIMEOUT": {
         "category": ErrorCategory.NETWORK,
         "message": "Request timed out.",
-        "suggestions": [
+        "suggestions": (
             "Retry the request",
             "Reduce the complexity of the operation",
             "Check Salesforce Trust site for service issues",
             "Consider breaking the operation into smaller parts"
-        ]
+        )
+    }
+}
+
+# Read-only view with interned codes, so lookups by an interned code compare by identity
+SALESFORCE_ERROR_PATTERNS: Mapping[str, Dict[str, Any]] = MappingProxyType({
+    sys.intern(code): info for code, info in _ERROR_PATTERNS.items()
+})
+
+
+def _build_response_template(code: str, info: Dict[str, Any], include_suggestions: bool) -> Dict[str, Any]:
+    """Build the constant part of create_error_response() output for a known code"""
+    template: Dict[str, Any] = {
+        "error": info["message"],
+        "error_code": code,
+        "category": info["category"].value
     }
+    if include_suggestions and info.get("suggestions"):
+        template["suggestions"] = info["suggestions"]
+    if info.get("doc_link"):
+        template["documentation"] = info["doc_link"]
+    return template
+
+
+# Prebuilt response fields per known code, indexed by include_suggestions,
+# so create_error_response only fills in the per-error fields
+_ERROR_RESPONSE_TEMPLATES: Dict[str, Tuple[Dict[str, Any], Dict[str, Any]]] = {
+    code: (
+        _build_response_template(code, info, False),
+        _build_response_template(code, info, True)
+    )
+    for code, info in SALESFORCE_ERROR_PATTERNS.items()
 }
 
 
@@ -325,6 +377,27 @@ SALESFORCE_ERROR_PATTERNS: Dict[str, Dict[str, Any]] = {
 # ERROR MESSAGE ENHANCEMENT FUNCTIONS
 # =============================================================================
 
+# Compiled once at import, tried in order by parse_salesforce_error
+_ERROR_CODE_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r"\[(\w+)\]",  # [ERROR_CODE]
+    r"errorCode['\"]?\s*[:=]\s*['\"]?(\w+)",  # errorCode: ERROR_CODE
+    r"^(\w+_\w+):",  # ERROR_CODE: message
+    r"exception.*?(\w+Exception)",  # SomeException
+))
+
+_FIELD_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r"field[:\s]+['\"]?(\w+)['\"]?",
+    r"(\w+__c)\s+(?:is|does|cannot)",
+    r"(?:on|for)\s+field\s+['\"]?(\w+)"
+))
+
+_OBJECT_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r"object[:\s]+['\"]?(\w+)['\"]?",
+    r"(?:on|from|to)\s+(\w+__c)",
+    r"(?:Account|Contact|Lead|Opportunity|Case|(\w+__c))"
+))
+
+
 def parse_salesforce_error(error_message: str) -> Tuple[str, Optional[str], Optional[str]]:
     """
     Parse a Salesforce error message to extract error code and details.
@@ -340,39 +413,23 @@ def parse_salesforce_error(error_message: str) -> Tuple[str, Optional[str], Opti
     object_name = None
 
     # Try to extract error code from common patterns
-    patterns = [
-        r"\[(\w+)\]",  # [ERROR_CODE]
-        r"errorCode['\"]?\s*[:=]\s*['\"]?(\w+)",  # errorCode: ERROR_CODE
-        r"^(\w+_\w+):",  # ERROR_CODE: message
-        r"exception.*?(\w+Exception)",  # SomeException
-    ]
-
-    for pattern in patterns:
-        match = re.search(pattern, error_message, re.IGNORECASE)
+    for pattern in _ERROR_CODE_PATTERNS:
+        match = pattern.search(error_message)
         if match:
-            error_code = match.group(1).upper()
+            # Interned to match the interned SALESFORCE_ERROR_PATTERNS keys by identity
+            error_code = sys.intern(match.group(1).upper())
             break
 
     # Extract field name if present
-    field_patterns = [
-        r"field[:\s]+['\"]?(\w+)['\"]?",
-        r"(\w+__c)\s+(?:is|does|cannot)",
-        r"(?:on|for)\s+field\s+['\"]?(\w+)"
-    ]
-    for pattern in field_patterns:
-        match = re.search(pattern, error_message, re.IGNORECASE)
+    for pattern in _FIELD_PATTERNS:
+        match = pattern.search(error_message)
         if match:
             field_name = match.group(1)
             break
 
     # Extract object name if present
-    object_patterns = [
-        r"object[:\s]+['\"]?(\w+)['\"]?",
-        r"(?:on|from|to)\s+(\w+__c)",
-        r"(?:Account|Contact|Lead|Opportunity|Case|(\w+__c))"
-    ]
-    for pattern in object_patterns:
-        match = re.search(pattern, error_message, re.IGNORECASE)
+    for pattern in _OBJECT_PATTERNS:
+        match = pattern.search(error_message)
         if match:
             object_name = match.group(1)
             break
@@ -395,7 +452,16 @@ def enhance_error_message(
         SalesforceError with detailed message and suggestions
     """
     error_message = str(error)
-    error_code, field_name, object_name = parse_salesforce_error(error_message)
+    return _enhance_parsed_error(error_message, parse_salesforce_error(error_message), context)
+
+
+def _enhance_parsed_error(
+    error_message: str,
+    parsed: Tuple[str, Optional[str], Optional[str]],
+    context: Optional[Dict[str, Any]]
+) -> SalesforceError:
+    """Build a SalesforceError from an already parsed error message"""
+    error_code, field_name, object_name = parsed
 
     # Check context for additional info
     if context:
@@ -403,13 +469,19 @@ def enhance_error_message(
         object_name = object_name or context.get("object_name")
 
     # Look up error pattern
-    error_info = SALESFORCE_ERROR_PATTERNS.get(error_code, {})
+    error_info = SALESFORCE_ERROR_PATTERNS.get(error_code)
 
     # Build enhanced error
-    category = error_info.get("category", ErrorCategory.UNKNOWN)
-    message = error_info.get("message", f"An error occurred: {error_message}")
-    suggestions = error_info.get("suggestions", [])
-    doc_link = error_info.get("doc_link")
+    if error_info is not None:
+        category = error_info["category"]
+        message = error_info["message"]
+        suggestions = error_info.get("suggestions", ())
+        doc_link = error_info.get("doc_link")
+    else:
+        category = ErrorCategory.UNKNOWN
+        message = f"An error occurred: {error_message}"
+        suggestions = ()
+        doc_link = None
 
     # Add context-specific suggestions
     if not suggestions:
@@ -427,62 +499,78 @@ def enhance_error_message(
     )
 
 
-def _generate_contextual_suggestions(
-    error_message: str,
-    context: Optional[Dict[str, Any]] = None
-) -> List[str]:
-    """Generate suggestions based on error message content"""
-    suggestions = []
-    error_lower = error_message.lower()
-
+# Substring terms and the suggestions they trigger, checked in this order
+_CONTEXTUAL_SUGGESTION_RULES = (
     # Authentication related
-    if any(term in error_lower for term in ["session", "token", "login", "auth"]):
-        suggestions.extend([
+    (
+        ("session", "token", "login", "auth"),
+        (
             "Check authentication status using salesforce_auth_status",
             "Try logging out and back in using salesforce_logout then salesforce_login",
             "Verify your session hasn't timed out"
-        ])
-
+        )
+    ),
     # Permission related
-    if any(term in error_lower for term in ["permission", "access", "denied", "insufficient"]):
-        suggestions.extend([
+    (
+        ("permission", "access", "denied", "insufficient"),
+        (
             "Use list_available_profiles and list_available_permission_sets to check access",
             "Verify field-level security and object permissions",
             "Check sharing rules and ownership"
-        ])
-
+        )
+    ),
     # Query related
-    if any(term in error_lower for term in ["query", "soql", "select", "from"]):
-        suggestions.extend([
+    (
+        ("query", "soql", "select", "from"),
+        (
             "Check field and object API names are correct",
             "Use fetch_object_metadata to verify available fields",
             "Ensure WHERE clause values are properly formatted"
-        ])
-
+        )
+    ),
     # Trigger/Flow related
-    if any(term in error_lower for term in ["trigger", "flow", "process", "workflow"]):
-        suggestions.extend([
+    (
+        ("trigger", "flow", "process", "workflow"),
+        (
             "Use diagnose_and_fix_issue to analyze automation issues",
             "Check for recursion in triggers",
             "Review Flow and Process Builder for failing automations"
-        ])
-
+        )
+    ),
     # Validation related
-    if any(term in error_lower for term in ["validation", "required", "invalid"]):
-        suggestions.extend([
+    (
+        ("validation", "required", "invalid"),
+        (
             "Check validation rules on the object",
             "Ensure all required fields have values",
             "Review field data types and format requirements"
-        ])
+        )
+    )
+)
+
+_GENERIC_SUGGESTIONS = (
+    "Check the Salesforce debug logs for more details",
+    "Verify the operation and data are correct",
+    "Consult Salesforce documentation for the specific error",
+    "Use salesforce_health_check to verify connection"
+)
+
+
+def _generate_contextual_suggestions(
+    error_message: str,
+    context: Optional[Dict[str, Any]] = None
+) -> Tuple[str, ...]:
+    """Generate suggestions based on error message content"""
+    suggestions: Tuple[str, ...] = ()
+    error_lower = error_message.lower()
+
+    for terms, rule_suggestions in _CONTEXTUAL_SUGGESTION_RULES:
+        if any(term in error_lower for term in terms):
+            suggestions += rule_suggestions
 
     # If no specific suggestions, add generic ones
     if not suggestions:
-        suggestions = [
-            "Check the Salesforce debug logs for more details",
-            "Verify the operation and data are correct",
-            "Consult Salesforce documentation for the specific error",
-            "Use salesforce_health_check to verify connection"
-        ]
+        return _GENERIC_SUGGESTIONS
 
     return suggestions
 
@@ -507,14 +595,48 @@ def create_error_response(
     Returns:
         JSON string with error details and suggestions
     """
+    return _dumps(_build_error_dict(success, error, error_message, context, include_suggestions))
+
+
+def _build_error_dict(
+    success: bool,
+    error: Optional[Exception],
+    error_message: Optional[str],
+    context: Optional[Dict[str, Any]],
+    include_suggestions: bool,
+    error_str: Optional[str] = None
+) -> Dict[str, Any]:
+    """Build the create_error_response() payload as a dict (not yet serialized).
+
+    error_str is str(error) when the caller already has it.
+    """
     response: Dict[str, Any] = {"success": success}
 
     if error or error_message:
-        if error:
-            enhanced = enhance_error_message(error, context)
+        if error_str is not None:
+            raw_message = error_str
         else:
-            # Create a mock exception for the message
-            enhanced = enhance_error_message(Exception(error_message), context)
+            raw_message = str(error) if error else str(error_message)
+        parsed = parse_salesforce_error(raw_message)
+        templates = _ERROR_RESPONSE_TEMPLATES.get(parsed[0])
+
+        if templates is not None:
+            # Known code: copy the prebuilt fields, then add the per-error ones
+            _, field_name, object_name = parsed
+            if context:
+                field_name = field_name or context.get("field_name")
+                object_name = object_name or context.get("object_name")
+
+            response.update(templates[bool(include_suggestions)])
+            if raw_message != response["error"]:
+                response["original_error"] = raw_message
+            if field_name:
+                response["field"] = field_name
+            if object_name:
+                response["object"] = object_name
+            return response
+
+        enhanced = _enhance_parsed_error(raw_message, parsed, context)
 
         response["error"] = enhanced.message
         response["error_code"] = enhanced.error_code
@@ -534,7 +656,7 @@ def create_error_response(
         if enhanced.object_name:
             response["object"] = enhanced.object_name
 
-    return json.dumps(response, indent=2)
+    return response
 
 
 # =============================================================================
@@ -561,11 +683,7 @@ def handle_query_error(
         "object_name": object_name
     }
 
-    response_data = json.loads(create_error_response(
-        success=False,
-        error=error,
-        context=context
-    ))
+    response_data = _build_error_dict(False, error, None, context, True)
 
     # Add query-specific suggestions
     if query:
@@ -586,7 +704,7 @@ def handle_query_error(
         if query_suggestions:
             response_data["query_analysis"] = query_suggestions
 
-    return json.dumps(response_data, indent=2)
+    return _dumps(response_data)
 
 
 def handle_deployment_error(
@@ -601,14 +719,11 @@ def handle_deployment_error(
         "component_name": component_name
     }
 
-    response_data = json.loads(create_error_response(
-        success=False,
-        error=error,
-        context=context
-    ))
+    error_str = str(error)
+    response_data = _build_error_dict(False, error, None, context, True, error_str)
 
     # Add deployment-specific suggestions
-    error_lower = str(error).lower()
+    error_lower = error_str.lower()
     deployment_suggestions = []
 
     if "apex" in error_lower:
@@ -635,7 +750,7 @@ def handle_deployment_error(
     if deployment_suggestions:
         response_data["deployment_hints"] = deployment_suggestions
 
-    return json.dumps(response_data, indent=2)
+    return _dumps(response_data)
 
 
 def handle_bulk_operation_error(
@@ -650,29 +765,21 @@ def handle_bulk_operation_error(
         "object_name": object_name
     }
 
-    response_data = json.loads(create_error_response(
-        success=False,
-        error=error,
-        context=context
-    ))
+    response_data = _build_error_dict(False, error, None, context, True)
 
     if failed_records:
         response_data["failed_record_count"] = len(failed_records)
         response_data["failed_records_sample"] = failed_records[:5]  # Show first 5
 
-        # Analyze common failure patterns
-        error_patterns = {}
-        for record in failed_records:
-            err = record.get("error", "Unknown")
-            error_patterns[err] = error_patterns.get(err, 0) + 1
+        # Analyze common failure patterns (most_common breaks ties by first seen, like a stable sort)
+        error_patterns = Counter(record.get("error", "Unknown") for record in failed_records)
 
         if error_patterns:
             response_data["error_pattern_summary"] = [
-                {"error": k, "count": v} for k, v in
-                sorted(error_patterns.items(), key=lambda x: x[1], reverse=True)[:5]
+                {"error": k, "count": v} for k, v in error_patterns.most_common(5)
             ]
 
-    return json.dumps(response_data, indent=2)
+    return _dumps(response_data)
 
 
 # =============================================================================
@@ -8,19 +8,54 @@ Provides:
 
 Created by Sameer
 """
+import re
+import copy
 import json
 import base64
 import logging
-from typing import Any, Dict, List, Optional, TypeVar, Generic, Callable
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, TypeVar, Generic, Callable, Tuple, Iterator, Sequence
 from dataclasses import dataclass, asdict
-from math import ceil
+
+# Optional: orjson serializes several times faster than the stdlib json module
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+    # Datetimes and dataclasses go through default=str like the stdlib path
+    _ORJSON_OPTIONS = (
+        orjson.OPT_NON_STR_KEYS
+        | orjson.OPT_PASSTHROUGH_DATETIME
+        | orjson.OPT_PASSTHROUGH_DATACLASS
+    )
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+# SOQL pagination clause patterns, compiled once at import
+_LIMIT_RE = re.compile(r'\bLIMIT\s+(\d+)', re.IGNORECASE)
+_OFFSET_RE = re.compile(r'\bOFFSET\s+(\d+)', re.IGNORECASE)
+_STRIP_PAGINATION_RE = re.compile(r'\s+(?:LIMIT|OFFSET)\s+\d+', re.IGNORECASE)
+
 T = TypeVar('T')
 
 
-@dataclass
+def _dumps(obj: Any) -> str:
+    """Serialize a response compactly (orjson when installed), str() for unknown types"""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(obj, default=str, option=_ORJSON_OPTIONS).decode()
+        except TypeError:
+            pass  # e.g. ints beyond 64 bits - stdlib json handles them
+    return json.dumps(obj, default=str, separators=(",", ":"))
+
+
+def _ceil_div(total: int, page_size: int) -> int:
+    """Number of pages for total items (integer ceiling division; 1 if page_size <= 0)"""
+    return (total + page_size - 1) // page_size if page_size > 0 else 1
+
+
+@dataclass(slots=True)
 class PaginationInfo:
     """Pagination metadata for responses"""
     total_records: int
@@ -50,7 +85,7 @@ class PaginationInfo:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class PaginatedResponse(Generic[T]):
     """Paginated response wrapper"""
     success: bool
@@ -71,7 +106,7 @@ class PaginatedResponse(Generic[T]):
 
     def to_json(self) -> str:
         """Convert to JSON string"""
-        return json.dumps(self.to_dict(), indent=2, default=str)
+        return _dumps(self.to_dict())
 
 
 # =============================================================================
@@ -90,6 +125,9 @@ def encode_cursor(offset: int, page_size: int, extra_data: Optional[Dict] = None
     Returns:
         Base64 encoded cursor string
     """
+    if not extra_data:
+        return _encode_cursor_cached(offset, page_size)
+
     cursor_data = {
         "o": offset,
         "p": page_size
@@ -101,6 +139,15 @@ def encode_cursor(offset: int, page_size: int, extra_data: Optional[Dict] = None
     return base64.urlsafe_b64encode(cursor_json.encode()).decode()
 
 
+# Sequential paging re-encodes and re-decodes the same few cursors; typed so
+# 1 and 1.0 (which encode differently) get separate entries
+@lru_cache(maxsize=256, typed=True)
+def _encode_cursor_cached(offset: int, page_size: int) -> str:
+    """Encode a cursor without extra data (memoized)"""
+    cursor_json = json.dumps({"o": offset, "p": page_size})
+    return base64.urlsafe_b64encode(cursor_json.encode()).decode()
+
+
 def decode_cursor(cursor: str) -> Dict[str, Any]:
     """
     Decode pagination cursor.
@@ -111,17 +158,41 @@ def decode_cursor(cursor: str) -> Dict[str, Any]:
     Returns:
         Dictionary with offset, page_size, and extra_data
     """
+    offset, page_size, extra_data = _decode_cursor_values(cursor)
+    return {
+        "offset": offset,
+        "page_size": page_size,
+        # The cached value is shared, so callers get their own copy
+        "extra_data": copy.deepcopy(extra_data) if extra_data is not None else None
+    }
+
+
+def _decode_cursor_values(cursor: str) -> Tuple[Any, Any, Any]:
+    """Decode a cursor to an (offset, page_size, extra_data) tuple without building a dict"""
     try:
-        cursor_json = base64.urlsafe_b64decode(cursor.encode()).decode()
-        cursor_data = json.loads(cursor_json)
-        return {
-            "offset": cursor_data.get("o", 0),
-            "page_size": cursor_data.get("p", 100),
-            "extra_data": cursor_data.get("e")
-        }
+        # Non-str cursors skip the cache - they may be unhashable
+        if type(cursor) is str:
+            return _parse_cursor_cached(cursor)
+        return _parse_cursor(cursor)
     except Exception as e:
         logger.warning(f"Failed to decode cursor: {e}")
-        return {"offset": 0, "page_size": 100, "extra_data": None}
+        return 0, 100, None
+
+
+def _parse_cursor(cursor: str) -> Tuple[Any, Any, Any]:
+    """Decode a cursor to an (offset, page_size, extra_data) tuple, raising if it is invalid"""
+    cursor_json = base64.urlsafe_b64decode(cursor.encode()).decode()
+    cursor_data = json.loads(cursor_json)
+    get = cursor_data.get
+    return get("o", 0), get("p", 100), get("e")
+
+
+# Failures raise out of the cache, so only valid cursors are memoized and
+# every invalid one is logged
+@lru_cache(maxsize=256)
+def _parse_cursor_cached(cursor: str) -> Tuple[Any, Any, Any]:
+    """Decode a cursor (memoized)"""
+    return _parse_cursor(cursor)
 
 
 # =============================================================================
@@ -147,7 +218,7 @@ def paginate_list(
         PaginatedResponse with paginated data
     """
     total_records = len(items)
-    total_pages = ceil(total_records / page_size) if page_size > 0 else 1
+    total_pages = _ceil_div(total_records, page_size)
 
     # Ensure valid page number
     page = max(1, min(page, total_pages)) if total_pages > 0 else 1
@@ -210,9 +281,7 @@ def paginate_from_cursor(
         PaginatedResponse with paginated data
     """
     if cursor:
-        cursor_data = decode_cursor(cursor)
-        offset = cursor_data["offset"]
-        page_size = cursor_data["page_size"]
+        offset, page_size, _ = _decode_cursor_values(cursor)
     else:
         offset = 0
 
@@ -222,7 +291,7 @@ def paginate_from_cursor(
 
     # Calculate page number
     current_page = (offset // page_size) + 1 if page_size > 0 else 1
-    total_pages = ceil(total_records / page_size) if page_size > 0 else 1
+    total_pages = _ceil_div(total_records, page_size)
 
     has_next = end_index < total_records
     has_previous = offset > 0
@@ -252,6 +321,66 @@ def paginate_from_cursor(
     )
 
 
+def _build_page(
+    items: Sequence[T],
+    offset: int,
+    page_size: int,
+    current_page: int
+) -> PaginatedResponse[T]:
+    """Build one page starting at offset (pages before it may have used other sizes)"""
+    total_records = len(items)
+    end_index = min(offset + page_size, total_records)
+    has_next = end_index < total_records
+    has_previous = offset > 0
+
+    # Pages so far plus what the remaining items need at this page size
+    total_pages = current_page
+    if has_next:
+        total_pages += _ceil_div(total_records - end_index, page_size)
+
+    pagination = PaginationInfo(
+        total_records=total_records,
+        page_size=page_size,
+        current_page=current_page,
+        total_pages=total_pages,
+        has_next=has_next,
+        has_previous=has_previous,
+        next_cursor=encode_cursor(end_index, page_size) if has_next else None,
+        previous_cursor=encode_cursor(max(0, offset - page_size), page_size) if has_previous else None,
+        start_index=offset,
+        end_index=end_index
+    )
+
+    return PaginatedResponse(
+        success=True,
+        data=items[offset:end_index],
+        pagination=pagination
+    )
+
+
+def iter_pages(items: Sequence[T], page_size: int = 100) -> Iterator[PaginatedResponse[T]]:
+    """
+    Yield every page of items in order.
+
+    Walks the sequence once by offset, slicing only each page, instead of
+    calling paginate_list once per page number.
+
+    Args:
+        items: Sequence of items to paginate
+        page_size: Number of items per page
+
+    Yields:
+        PaginatedResponse for each page
+    """
+    if page_size <= 0:
+        # Same single empty page paginate_list returns for a non-positive size
+        yield paginate_list(items, 1, page_size)
+        return
+
+    for current_page, offset in enumerate(range(0, len(items), page_size), 1):
+        yield _build_page(items, offset, page_size, current_page)
+
+
 def create_paginated_response(
     items: List[Any],
     page: int = 1,
@@ -282,7 +411,7 @@ def create_paginated_response(
     if extra_fields:
         result.update(extra_fields)
 
-    return json.dumps(result, indent=2, default=str)
+    return _dumps(result)
 
 
 # =============================================================================
@@ -329,17 +458,15 @@ def extract_pagination_from_soql(query: str) -> Dict[str, int]:
     Returns:
         Dictionary with limit and offset values
     """
-    import re
-
     result = {"limit": None, "offset": 0}
 
     # Extract LIMIT
-    limit_match = re.search(r'\bLIMIT\s+(\d+)', query, re.IGNORECASE)
+    limit_match = _LIMIT_RE.search(query)
     if limit_match:
         result["limit"] = int(limit_match.group(1))
 
     # Extract OFFSET
-    offset_match = re.search(r'\bOFFSET\s+(\d+)', query, re.IGNORECASE)
+    offset_match = _OFFSET_RE.search(query)
     if offset_match:
         result["offset"] = int(offset_match.group(1))
 
@@ -364,11 +491,8 @@ def build_next_page_query(
     Returns:
         Next page query or None if no more pages
     """
-    import re
-
     # Remove existing LIMIT and OFFSET
-    clean_query = re.sub(r'\s+LIMIT\s+\d+', '', base_query, flags=re.IGNORECASE)
-    clean_query = re.sub(r'\s+OFFSET\s+\d+', '', clean_query, flags=re.IGNORECASE)
+    clean_query = _STRIP_PAGINATION_RE.sub('', base_query)
 
     next_offset = current_offset + page_size
 
@@ -404,18 +528,23 @@ def chunk_large_response(
     """
     chunks = []
     current_page = 1
+    offset = 0
+    total_records = len(data)
 
-    while (current_page - 1) * page_size < len(data):
-        response = paginate_list(data, current_page, page_size)
+    # Single pass by offset: an oversized chunk is re-split in place at the
+    # same offset, so earlier chunks are never rebuilt and no item is repeated
+    while offset < total_records:
+        response = _build_page(data, offset, page_size, current_page)
 
         # Check if response fits within size limit
         response_json = response.to_json()
         if len(response_json.encode('utf-8')) > max_size and page_size > 10:
             # Response too large, reduce page size and retry
             page_size = page_size // 2
-            response = paginate_list(data, current_page, page_size)
+            continue
 
         chunks.append(response)
+        offset += page_size
         current_page += 1
 
         # Safety limit
@@ -426,18 +555,25 @@ def chunk_large_response(
     return chunks
 
 
-def estimate_response_size(items: List[Any]) -> int:
+def estimate_response_size(items: List[Any], sample_cap: int = 32) -> int:
     """
     Estimate the JSON response size for a list of items.
 
+    Lists longer than sample_cap are estimated from their first sample_cap
+    items scaled to the full length, instead of serializing everything.
+
     Args:
         items: List of items
+        sample_cap: Maximum number of items to serialize
 
     Returns:
         Estimated size in bytes
     """
     try:
-        return len(json.dumps(items, default=str).encode('utf-8'))
+        if len(items) <= sample_cap:
+            return len(_dumps(items).encode('utf-8'))
+        sample_size = len(_dumps(items[:sample_cap]).encode('utf-8'))
+        return int(sample_size * len(items) / sample_cap)
     except Exception:
         # Rough estimate: 100 bytes per item
         return len(items) * 100
@@ -499,7 +635,7 @@ def paginated_query_response(
     Returns:
         JSON response string
     """
-    total_pages = ceil(total_size / page_size) if page_size > 0 else 1
+    total_pages = _ceil_div(total_size, page_size)
 
     response = {
         "success": True,
@@ -520,7 +656,7 @@ def paginated_query_response(
             f"Add 'OFFSET {page * page_size}' to query for next page"
         )
 
-    return json.dumps(response, indent=2, default=str)
+    return _dumps(response)
 
 
 def paginated_metadata_response(
@@ -545,4 +681,4 @@ def paginated_metadata_response(
     result = response.to_dict()
     result["metadata_type"] = metadata_type
 
-    return json.dumps(result, indent=2, default=str)
+    return _dumps(result)
@@ -8,7 +8,52 @@ Enhanced with:
 - Query builder helpers
 """
 import re
-from typing import Optional, List, Dict, Any
+from functools import lru_cache
+from typing import Optional, List, Dict, Any, Tuple
+
+# Validation patterns, compiled once at import
+_FIELD_PATH_RE = re.compile(r'^[a-zA-Z][a-zA-Z0-9_\.]*$')
+# A whole SELECT list joined with \x1f (a character field names can't contain)
+_FIELD_LIST_RE = re.compile(r'[a-zA-Z][a-zA-Z0-9_\.]*(?:\x1f[a-zA-Z][a-zA-Z0-9_\.]*)*')
+_OBJECT_RE = re.compile(r'^[a-zA-Z][a-zA-Z0-9_]*(__c|__mdt|__e|__b|__x|__r)?$')
+_START_LETTER_RE = re.compile(r'^[a-zA-Z]')
+_API_NAME_RE = re.compile(
+    r'^[a-zA-Z][a-zA-Z0-9_]*(__c|__mdt|__e|__b|__x|__kav|__ka|__Feed|__Share|__History|__Tag)?$'
+)
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+_NON_ALNUM_RE = re.compile(r'[^a-zA-Z0-9_]')
+
+# Queries validate_soql_query accepts must start with SELECT and contain none
+# of these (matched case-insensitively)
+_STARTS_WITH_SELECT_RE = re.compile(r'\s*SELECT', re.IGNORECASE)
+_DANGEROUS_SOQL_PATTERNS = (
+    '--',  # SQL comments
+    '/*',  # Multi-line comments
+    ';',   # Multiple statements
+    'EXEC',
+    'EXECUTE',
+    'DROP',
+    'DELETE FROM',  # Should use DML API
+    'UPDATE ',  # Should use DML API
+    'INSERT ',  # Should use DML API
+)
+# A trailing space only counts before more text - the query used to be
+# checked after strip()
+_DANGEROUS_SOQL_CHECKS = tuple(
+    (pattern, re.compile(re.escape(pattern) + (r'(?!\s*\Z)' if pattern.endswith(' ') else ''), re.IGNORECASE))
+    for pattern in _DANGEROUS_SOQL_PATTERNS
+)
+_DANGEROUS_SOQL_RE = re.compile('|'.join(regex.pattern for _, regex in _DANGEROUS_SOQL_CHECKS), re.IGNORECASE)
+
+# Operators and ORDER BY directions accepted by the query builders
+_VALID_SOQL_OPERATORS = frozenset({
+    '=', '!=', '<>', 'LIKE', 'IN', 'NOT IN', '>', '<', '>=', '<=', 'INCLUDES', 'EXCLUDES'
+})
+_VALID_ORDER_DIRECTIONS = frozenset({'ASC', 'DESC'})
+
+# Object names accepted by validate_object_name
+_CUSTOM_OBJECT_SUFFIXES = ('__c', '__mdt', '__e', '__b', '__x')
+_STANDARD_OBJECTS = frozenset({'Account', 'Contact', 'Lead', 'Opportunity', 'Case', 'User', 'Task', 'Event'})
 
 
 class ValidationError(Exception):
@@ -23,6 +68,33 @@ class ValidationError(Exception):
 # SOQL INJECTION PROTECTION
 # =============================================================================
 
+# Characters rewritten by SOQL escaping; the LIKE table adds the wildcards
+_SOQL_ESCAPE_MAP = {
+    "\\": "\\\\",
+    "'": "\\'",
+    "\x00": "",  # Remove null bytes
+    "\n": " ",   # Remove other potentially dangerous characters
+    "\r": " ",
+}
+_SOQL_ESCAPE_TABLE = str.maketrans(_SOQL_ESCAPE_MAP)
+_SOQL_LIKE_ESCAPE_TABLE = str.maketrans({**_SOQL_ESCAPE_MAP, "%": "\\%", "_": "\\_"})
+
+
+def _needs_soql_escape(value: str) -> bool:
+    """Check for any character _SOQL_ESCAPE_MAP rewrites (most IDs and picklist values have none)"""
+    return "'" in value or "\\" in value or "\x00" in value or "\n" in value or "\r" in value
+
+
+def _escape_soql_chars(value: str) -> str:
+    """
+    Apply _SOQL_ESCAPE_MAP to a string in a single translate pass.
+
+    Each character is rewritten once, so the backslashes added for quotes
+    are never doubled again.
+    """
+    return value.translate(_SOQL_ESCAPE_TABLE)
+
+
 def escape_soql_string(value: str) -> str:
     """
     Escape a string value for safe use in SOQL queries.
@@ -41,22 +113,11 @@ def escape_soql_string(value: str) -> str:
     if value is None:
         return ""
 
-    # Convert to string if not already
+    # Convert to string if not already, then escape in one pass
     value = str(value)
-
-    # Escape single quotes by doubling them (SOQL standard)
-    value = value.replace("'", "\\'")
-
-    # Escape backslashes
-    value = value.replace("\\", "\\\\")
-
-    # Remove null bytes
-    value = value.replace("\x00", "")
-
-    # Remove other potentially dangerous characters
-    value = value.replace("\n", " ").replace("\r", " ")
-
-    return value
+    if not _needs_soql_escape(value):
+        return value
+    return _escape_soql_chars(value)
 
 
 def escape_soql_like(value: str) -> str:
@@ -77,14 +138,11 @@ def escape_soql_like(value: str) -> str:
     if value is None:
         return ""
 
-    # First apply standard escaping
-    value = escape_soql_string(value)
-
-    # Escape LIKE wildcards
-    value = value.replace("%", "\\%")
-    value = value.replace("_", "\\_")
-
-    return value
+    # Standard escaping plus LIKE wildcards, in one pass
+    value = str(value)
+    if not ("%" in value or "_" in value or _needs_soql_escape(value)):
+        return value
+    return value.translate(_SOQL_LIKE_ESCAPE_TABLE)
 
 
 def build_safe_soql_in_clause(values: List[str]) -> str:
@@ -105,8 +163,32 @@ def build_safe_soql_in_clause(values: List[str]) -> str:
     if not values:
         return "()"
 
-    escaped_values = [f"'{escape_soql_string(v)}'" for v in values]
-    return f"({','.join(escaped_values)})"
+    # The values are scanned twice below, so one-shot iterables are materialized
+    if not isinstance(values, (list, tuple)):
+        values = list(values)
+        if not values:
+            return "()"
+
+    # Record IDs and most picklist values need no escaping: one scan over the
+    # concatenated values lets them skip escape_soql_string entirely. Non-string
+    # values make join raise and take the per-value path below
+    try:
+        concatenated = "".join(values)
+    except TypeError:
+        concatenated = None
+
+    if concatenated is not None:
+        if not _needs_soql_escape(concatenated):
+            return "('" + "','".join(values) + "')"
+
+        # Escaping is per character, so the values can be escaped in one pass
+        # joined on a placeholder that none of them contains
+        if "\x1f" not in concatenated:
+            escaped = _escape_soql_chars("\x1f".join(values))
+            return "('" + escaped.replace("\x1f", "','") + "')"
+
+    # One join with the quotes in the separator, instead of an f-string per value
+    return "('" + "','".join([escape_soql_string(v) for v in values]) + "')"
 
 
 def build_safe_where_clause(field: str, operator: str, value: Any) -> str:
@@ -126,40 +208,68 @@ def build_safe_where_clause(field: str, operator: str, value: Any) -> str:
         query = f"SELECT Id FROM Account WHERE {condition}"
     """
     # Validate field name to prevent injection
-    if not re.match(r'^[a-zA-Z][a-zA-Z0-9_\.]*$', field):
+    if not _FIELD_PATH_RE.match(field):
         raise ValidationError(f"Invalid field name: {field}")
 
     # Validate operator
-    valid_operators = ['=', '!=', '<>', 'LIKE', 'IN', 'NOT IN', '>', '<', '>=', '<=', 'INCLUDES', 'EXCLUDES']
-    if operator.upper() not in valid_operators:
+    operator_upper = operator.upper()
+    if operator_upper not in _VALID_SOQL_OPERATORS:
         raise ValidationError(f"Invalid operator: {operator}")
 
-    operator = operator.upper()
+    # Exact-type lookup covers the common value types in one step; subclasses
+    # (e.g. IntEnum, str subclasses) fall through to the isinstance checks
+    formatter = _WHERE_VALUE_FORMATTERS.get(type(value)) or _format_where_fallback
+    return formatter(field, operator_upper, value)
 
-    # Handle different value types
-    if value is None:
-        return f"{field} = null"
 
-    elif isinstance(value, bool):
-        return f"{field} {operator} {str(value).lower()}"
+def _format_where_null(field: str, operator: str, value: Any) -> str:
+    return f"{field} = null"
 
-    elif isinstance(value, (int, float)):
-        return f"{field} {operator} {value}"
 
-    elif isinstance(value, list):
-        if operator in ['IN', 'NOT IN']:
-            in_clause = build_safe_soql_in_clause(value)
-            return f"{field} {operator} {in_clause}"
-        else:
-            raise ValidationError(f"List values only supported with IN/NOT IN operators")
+def _format_where_bool(field: str, operator: str, value: Any) -> str:
+    return f"{field} {operator} {str(value).lower()}"
+
+
+def _format_where_number(field: str, operator: str, value: Any) -> str:
+    return f"{field} {operator} {value}"
+
 
+def _format_where_list(field: str, operator: str, value: Any) -> str:
+    if operator in ['IN', 'NOT IN']:
+        in_clause = build_safe_soql_in_clause(value)
+        return f"{field} {operator} {in_clause}"
     else:
-        # String value
-        if operator == 'LIKE':
-            escaped = escape_soql_string(str(value))  # Don't escape wildcards for LIKE
-        else:
-            escaped = escape_soql_string(str(value))
-        return f"{field} {operator} '{escaped}'"
+        raise ValidationError(f"List values only supported with IN/NOT IN operators")
+
+
+def _format_where_string(field: str, operator: str, value: Any) -> str:
+    # LIKE wildcards are not escaped, so every operator uses the same escaping.
+    # escape_soql_string is inlined here because this runs once per condition
+    value = value if type(value) is str else str(value)
+    if _needs_soql_escape(value):
+        value = _escape_soql_chars(value)
+    return f"{field} {operator} '{value}'"
+
+
+def _format_where_fallback(field: str, operator: str, value: Any) -> str:
+    if isinstance(value, bool):
+        return _format_where_bool(field, operator, value)
+    elif isinstance(value, (int, float)):
+        return _format_where_number(field, operator, value)
+    elif isinstance(value, list):
+        return _format_where_list(field, operator, value)
+    else:
+        return _format_where_string(field, operator, value)
+
+
+_WHERE_VALUE_FORMATTERS = {
+    type(None): _format_where_null,
+    bool: _format_where_bool,
+    int: _format_where_number,
+    float: _format_where_number,
+    list: _format_where_list,
+    str: _format_where_string,
+}
 
 
 class SafeSOQLBuilder:
@@ -176,6 +286,10 @@ class SafeSOQLBuilder:
             .limit(100)
             .build())
     """
+    __slots__ = (
+        "_select_fields", "_from_object", "_where_conditions",
+        "_order_by", "_limit", "_offset"
+    )
 
     def __init__(self):
         self._select_fields: List[str] = []
@@ -187,9 +301,25 @@ class SafeSOQLBuilder:
 
     def select(self, fields: List[str]) -> 'SafeSOQLBuilder':
         """Add SELECT fields"""
+        fields = list(fields)
+        # Validate the whole list in one regex pass. The separator count rejects
+        # a field that itself contains \x1f; anything else that fails falls
+        # through to the per-field loop, which reports the offending name
+        try:
+            joined = "\x1f".join(fields)
+        except TypeError:
+            joined = None
+        if (
+            joined is not None
+            and _FIELD_LIST_RE.fullmatch(joined)
+            and joined.count("\x1f") == len(fields) - 1
+        ):
+            self._select_fields.extend(fields)
+            return self
+
         for field in fields:
             # Validate field name
-            if not re.match(r'^[a-zA-Z][a-zA-Z0-9_\.]*$', field):
+            if not _FIELD_PATH_RE.match(field):
                 raise ValidationError(f"Invalid field name: {field}")
             self._select_fields.append(field)
         return self
@@ -197,7 +327,7 @@ class SafeSOQLBuilder:
     def from_object(self, obj: str) -> 'SafeSOQLBuilder':
         """Set FROM object"""
         # Validate object name
-        if not re.match(r'^[a-zA-Z][a-zA-Z0-9_]*(__c|__mdt|__e|__b|__x|__r)?$', obj):
+        if not _OBJECT_RE.match(obj):
             raise ValidationError(f"Invalid object name: {obj}")
         self._from_object = obj
         return self
@@ -215,23 +345,25 @@ class SafeSOQLBuilder:
 
     def order_by(self, field: str, direction: str = 'ASC') -> 'SafeSOQLBuilder':
         """Set ORDER BY"""
-        if not re.match(r'^[a-zA-Z][a-zA-Z0-9_\.]*$', field):
+        if not _FIELD_PATH_RE.match(field):
             raise ValidationError(f"Invalid field name for ORDER BY: {field}")
-        if direction.upper() not in ['ASC', 'DESC']:
+        direction_upper = direction.upper()
+        if direction_upper not in _VALID_ORDER_DIRECTIONS:
             raise ValidationError(f"Invalid ORDER BY direction: {direction}")
-        self._order_by = f"{field} {direction.upper()}"
+        self._order_by = f"{field} {direction_upper}"
         return self
 
     def limit(self, limit: int) -> 'SafeSOQLBuilder':
         """Set LIMIT"""
-        if not isinstance(limit, int) or limit < 0:
+        # bool is an int subclass - reject it rather than rendering LIMIT True
+        if type(limit) is not int or limit < 0:
             raise ValidationError(f"Invalid LIMIT value: {limit}")
         self._limit = limit
         return self
 
     def offset(self, offset: int) -> 'SafeSOQLBuilder':
         """Set OFFSET"""
-        if not isinstance(offset, int) or offset < 0:
+        if type(offset) is not int or offset < 0:
             raise ValidationError(f"Invalid OFFSET value: {offset}")
         self._offset = offset
         return self
@@ -243,21 +375,47 @@ class SafeSOQLBuilder:
         if not self._from_object:
             raise ValidationError("No object specified in FROM")
 
-        query = f"SELECT {', '.join(self._select_fields)} FROM {self._from_object}"
+        prefix, suffix = _build_soql_skeleton(
+            tuple(self._select_fields), self._from_object,
+            self._order_by, self._limit, self._offset
+        )
 
         if self._where_conditions:
-            query += f" WHERE {' AND '.join(self._where_conditions)}"
+            return f"{prefix} WHERE {' AND '.join(self._where_conditions)}{suffix}"
 
-        if self._order_by:
-            query += f" ORDER BY {self._order_by}"
+        return prefix + suffix
 
-        if self._limit is not None:
-            query += f" LIMIT {self._limit}"
 
-        if self._offset is not None:
-            query += f" OFFSET {self._offset}"
+@lru_cache(maxsize=1024)
+def _build_soql_skeleton(
+    select_fields: Tuple[str, ...],
+    from_object: str,
+    order_by: Optional[str],
+    limit: Optional[int],
+    offset: Optional[int]
+) -> Tuple[str, str]:
+    """
+    Build the parts of a SafeSOQLBuilder query around the WHERE clause.
+
+    Builders tend to repeat the same SELECT/FROM/ORDER BY shape with different
+    WHERE values, so the skeleton is cached and only the conditions are joined
+    per build.
+    """
+    prefix = f"SELECT {', '.join(select_fields)} FROM {from_object}"
 
-        return query
+    parts = []
+
+    if order_by:
+        parts += ("ORDER BY", order_by)
+
+    if limit is not None:
+        parts += ("LIMIT", str(limit))
+
+    if offset is not None:
+        parts += ("OFFSET", str(offset))
+
+    suffix = " " + " ".join(parts) if parts else ""
+    return prefix, suffix
 
 
 def validate_api_name(name: str, metadata_type: str = "API") -> bool:
@@ -283,6 +441,16 @@ def validate_api_name(name: str, metadata_type: str = "API") -> bool:
     Raises:
         ValidationError: If validation fails
     """
+    # Names come from a small per-org vocabulary, so valid ones are memoized
+    # (ValidationError results are never cached); non-str input skips the cache
+    if isinstance(name, str):
+        return _check_api_name(name)
+    return _check_api_name.__wrapped__(name)
+
+
+@lru_cache(maxsize=4096)
+def _check_api_name(name: str) -> bool:
+    """validate_api_name rules (memoized, process-local)"""
     if not name:
         raise ValidationError("API name cannot be empty")
 
@@ -290,11 +458,11 @@ def validate_api_name(name: str, metadata_type: str = "API") -> bool:
         raise ValidationError(f"API name too long (max 80 chars): {name}")
 
     # Check starts with letter
-    if not re.match(r'^[a-zA-Z]', name):
+    if not _START_LETTER_RE.match(name):
         raise ValidationError(f"API name must start with a letter: {name}")
 
     # Check valid characters
-    if not re.match(r'^[a-zA-Z][a-zA-Z0-9_]*(__c|__mdt|__e|__b|__x|__kav|__ka|__Feed|__Share|__History|__Tag)?$', name):
+    if not _API_NAME_RE.match(name):
         raise ValidationError(
             f"API name contains invalid characters (only letters, numbers, underscore allowed): {name}"
         )
@@ -317,13 +485,20 @@ def validate_object_name(name: str) -> bool:
     Raises:
         ValidationError: If validation fails
     """
+    if isinstance(name, str):
+        return _check_object_name(name)
+    return _check_object_name.__wrapped__(name)
+
+
+@lru_cache(maxsize=4096)
+def _check_object_name(name: str) -> bool:
+    """validate_object_name rules (memoized, process-local)"""
     validate_api_name(name, "CustomObject")
 
     # Custom objects must end with __c or __mdt
-    if not any(name.endswith(suffix) for suffix in ['__c', '__mdt', '__e', '__b', '__x']):
+    if not name.endswith(_CUSTOM_OBJECT_SUFFIXES):
         # Check if it's a standard object (acceptable)
-        standard_objects = ['Account', 'Contact', 'Lead', 'Opportunity', 'Case', 'User', 'Task', 'Event']
-        if name not in standard_objects:
+        if name not in _STANDARD_OBJECTS:
             raise ValidationError(
                 f"Custom object name must end with __c, __mdt, __e, __b, or __x: {name}"
             )
@@ -374,28 +549,16 @@ def validate_soql_query(query: str) -> bool:
     if not query:
         raise ValidationError("SOQL query cannot be empty")
 
-    query_upper = query.upper().strip()
-
-    # Must start with SELECT
-    if not query_upper.startswith('SELECT'):
+    # Must start with SELECT - matched case-insensitively in place rather than
+    # on an uppercase copy of the whole query
+    if not _STARTS_WITH_SELECT_RE.match(query):
         raise ValidationError("SOQL query must start with SELECT")
 
     # Block potentially dangerous operations
-    dangerous_patterns = [
-        '--',  # SQL comments
-        '/*',  # Multi-line comments
-        ';',   # Multiple statements
-        'EXEC',
-        'EXECUTE',
-        'DROP',
-        'DELETE FROM',  # Should use DML API
-        'UPDATE ',  # Should use DML API
-        'INSERT ',  # Should use DML API
-    ]
-
-    for pattern in dangerous_patterns:
-        if pattern in query_upper:
-            raise ValidationError(f"SOQL query contains potentially dangerous pattern: {pattern}")
+    if _DANGEROUS_SOQL_RE.search(query):
+        # Report the first listed pattern present, as the per-pattern checks did
+        pattern = next(pattern for pattern, regex in _DANGEROUS_SOQL_CHECKS if regex.search(query))
+        raise ValidationError(f"SOQL query contains potentially dangerous pattern: {pattern}")
 
     # Check balanced parentheses
     if query.count('(') != query.count(')'):
@@ -419,12 +582,26 @@ def validate_email(email: str) -> bool:
     Raises:
         ValidationError: If invalid
     """
+    if isinstance(email, str):
+        return _check_email(email)
+    return _check_email.__wrapped__(email)
+
+
+@lru_cache(maxsize=2048)
+def _check_email(email: str) -> bool:
+    """validate_email rules (memoized, process-local)"""
     if not email:
         raise ValidationError("Email cannot be empty")
 
+    # Exactly one '@' with something on both sides - cheap rejects before the regex
+    # (non-str input is left to the regex so it fails the same way as before)
+    if isinstance(email, str):
+        at = email.find('@')
+        if at < 1 or at == len(email) - 1 or email.find('@', at + 1) != -1:
+            raise ValidationError(f"Invalid email format: {email}")
+
     # Basic email regex
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    if not re.match(pattern, email):
+    if not _EMAIL_RE.match(email):
         raise ValidationError(f"Invalid email format: {email}")
 
     return True
@@ -449,10 +626,12 @@ def validate_url(url: str, require_https: bool = False) -> bool:
     if not url:
         raise ValidationError("URL cannot be empty")
 
-    if require_https and not url.startswith('https://'):
-        raise ValidationError(f"URL must use HTTPS: {url}")
-
-    if not url.startswith(('http://', 'https://')):
+    # An https:// prefix also satisfies the general scheme check, so only one
+    # prefix comparison runs per call
+    if require_https:
+        if not url.startswith('https://'):
+            raise ValidationError(f"URL must use HTTPS: {url}")
+    elif not url.startswith(('http://', 'https://')):
         raise ValidationError(f"URL must start with http:// or https://: {url}")
 
     return True
@@ -477,7 +656,7 @@ def sanitize_metadata_name(name: str) -> str:
     name = name.replace(' ', '_')
 
     # Remove any characters that aren't alphanumeric or underscore
-    name = re.sub(r'[^a-zA-Z0-9_]', '', name)
+    name = _NON_ALNUM_RE.sub('', name)
 
     # Ensure starts with letter
     if name and not name[0].isalpha():
@@ -502,8 +681,9 @@ def validate_label_length(label: str, max_length: int = 40) -> bool:
     Raises:
         ValidationError: If too long
     """
-    if len(label) > max_length:
-        raise ValidationError(f"Label too long (max {max_length} chars): {label} ({len(label)} chars)")
+    length = len(label)
+    if length > max_length:
+        raise ValidationError(f"Label too long (max {max_length} chars): {label} ({length} chars)")
 
     return True
 
@@ -524,9 +704,10 @@ def validate_description_length(description: str, max_length: int = 1000) -> boo
     Raises:
         ValidationError: If too long
     """
-    if len(description) > max_length:
+    length = len(description)
+    if length > max_length:
         raise ValidationError(
-            f"Description too long (max {max_length} chars): {len(description)} chars"
+            f"Description too long (max {max_length} chars): {length} chars"
         )
 
     return True